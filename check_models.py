@@ -5,9 +5,12 @@ Script to check available models from the Anthropic API with date suffixes
 
 import os
 import sys
-import anthropic
+import asyncio
 
-def main():
+from src.api_client import get_async_client
+from src.model_probe import MAX_CONCURRENT_PROBES, find_first_available
+
+async def main():
     # Get API key from environment
     api_key = os.environ.get('ANTHROPIC_API_KEY')
     if not api_key:
@@ -15,7 +18,8 @@ def main():
         sys.exit(1)
     
     # Initialize Anthropic client
-    client = anthropic.Anthropic(api_key=api_key)
+    client = get_async_client(api_key)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PROBES)
     
     # Try different date formats for Claude 3 models
     date_formats = [
@@ -46,33 +50,40 @@ def main():
         "claude-3-haiku"
     ]
     
-    print("Checking Anthropic models with date suffixes...")
+    # List the available models once and match them locally
+    try:
+        print("Listing available models from Anthropic API...")
+        # Iterate the paginated listing so models on later pages are included
+        available = {model.id async for model in client.models.list()}
+    except Exception as e:
+        print(f"Error listing models: {str(e)}")
+        print("Falling back to testing specific model names...")
+        available = None
     
-    # Try all combinations
-    for base_model in base_models:
-        print(f"\nChecking {base_model} with different date suffixes:")
-        for date_suffix in date_formats:
-            model_name = f"{base_model}-{date_suffix}"
-            try:
-                print(f"  Testing {model_name}...", end=" ")
-                # Just create a simple message to see if the model exists
-                client.messages.create(
-                    model=model_name,
-                    max_tokens=10,
-                    messages=[
-                        {"role": "user", "content": "Hello"}
-                    ]
-                )
-                print("✓ AVAILABLE")
-                # If we get here, the model exists
+    if available is not None:
+        for base_model in base_models:
+            matches = sorted(model_id for model_id in available if model_id.startswith(base_model))
+            for model_name in matches:
                 print(f"\n✅ FOUND WORKING MODEL: {model_name}\n")
-                break
-            except Exception as e:
-                error_msg = str(e)
-                if "not_found_error" in error_msg:
-                    print("✗ Not found")
-                else:
-                    print(f"✗ Error: {error_msg}")
+            if not matches:
+                print(f"\n✗ No working model found for {base_model}")
+        return
+    
+    print("Checking Anthropic models with date suffixes...")
+    
+    # Check each base model, probing all date suffixes concurrently
+    async def check_base_model(base_model):
+        model_names = [f"{base_model}-{date_suffix}" for date_suffix in date_formats]
+        return base_model, await find_first_available(client, semaphore, model_names)
+    
+    results = await asyncio.gather(*[check_base_model(base_model) for base_model in base_models])
+    
+    for base_model, model_name in results:
+        if model_name:
+            # If we get here, the model exists
+            print(f"\n✅ FOUND WORKING MODEL: {model_name}\n")
+        else:
+            print(f"\n✗ No working model found for {base_model}")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
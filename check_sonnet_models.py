@@ -5,10 +5,13 @@ Script to check for the latest Claude 3 Sonnet model
 
 import os
 import sys
-import anthropic
-from anthropic import Anthropic
+import asyncio
+import argparse
 
-def main():
+from src.api_client import get_async_client
+from src.model_probe import MAX_CONCURRENT_PROBES, find_first_available
+
+async def main(force_probe=False):
     # Get API key from environment
     api_key = os.environ.get('ANTHROPIC_API_KEY')
     if not api_key:
@@ -16,69 +19,64 @@ def main():
         sys.exit(1)
     
     # Initialize Anthropic client
-    client = Anthropic(api_key=api_key)
+    client = get_async_client(api_key)
     
     # Try to list available models directly
-    try:
-        print("Attempting to list available models from Anthropic API...")
-        models = client.models.list()
-        print("\nAvailable models:")
-        for model in models.data:
-            print(f"- {model.id}")
-            if "sonnet" in model.id.lower():
-                print(f"  ✅ FOUND SONNET MODEL: {model.id}")
-    except Exception as e:
-        print(f"Error listing models: {str(e)}")
-        print("Falling back to testing specific model names...")
-        
-        # Try specific model names for Claude 3 Sonnet
-        sonnet_models = [
-            "claude-3-sonnet-20250219",
-            "claude-3-sonnet-20250220",
-            "claude-3-sonnet-20250221",
-            "claude-3-sonnet-20250222",
-            "claude-3-sonnet-20250223",
-            "claude-3-sonnet-20250224",
-            "claude-3-sonnet-20250225",
-            "claude-3-sonnet-20250226",
-            "claude-3-sonnet-20250227",
-            "claude-3-sonnet-20250228",
-            "claude-3-sonnet-20250301",
-            "claude-3-sonnet-20250302",
-            "claude-3-sonnet-20250303",
-            "claude-3-sonnet-20250304",
-            "claude-3-sonnet-20250305",
-            "claude-3-sonnet-20250306",
-            "claude-3-sonnet-20250307",
-            "claude-3-sonnet-20250308",
-            "claude-3-sonnet-20250309",
-            "claude-3-sonnet-20250310",
-            "claude-3-sonnet-20250311",
-            "claude-3-sonnet-20250312",
-            "claude-3-sonnet-20250313",
-            "claude-3-sonnet-20250314",
-            "claude-3-sonnet-20250315",
-        ]
-        
-        for model_name in sonnet_models:
-            try:
-                print(f"Testing {model_name}...", end=" ")
-                client.messages.create(
-                    model=model_name,
-                    max_tokens=10,
-                    messages=[
-                        {"role": "user", "content": "Hello"}
-                    ]
-                )
-                print("✓ AVAILABLE")
-                print(f"\n✅ FOUND WORKING SONNET MODEL: {model_name}\n")
-                return
-            except Exception as e:
-                error_msg = str(e)
-                if "not_found_error" in error_msg:
-                    print("✗ Not found")
-                else:
-                    print(f"✗ Error: {error_msg}")
+    if not force_probe:
+        try:
+            print("Attempting to list available models from Anthropic API...")
+            print("\nAvailable models:")
+            # Iterate the paginated listing so models on later pages are included
+            async for model in client.models.list():
+                print(f"- {model.id}")
+                if "sonnet" in model.id.lower():
+                    print(f"  ✅ FOUND SONNET MODEL: {model.id}")
+            return
+        except Exception as e:
+            print(f"Error listing models: {str(e)}")
+            print("Re-run with --force-probe to test specific model names instead.")
+            return
+    
+    print("Testing specific model names...")
+    
+    # Try specific model names for Claude 3 Sonnet
+    sonnet_models = [
+        "claude-3-sonnet-20250219",
+        "claude-3-sonnet-20250220",
+        "claude-3-sonnet-20250221",
+        "claude-3-sonnet-20250222",
+        "claude-3-sonnet-20250223",
+        "claude-3-sonnet-20250224",
+        "claude-3-sonnet-20250225",
+        "claude-3-sonnet-20250226",
+        "claude-3-sonnet-20250227",
+        "claude-3-sonnet-20250228",
+        "claude-3-sonnet-20250301",
+        "claude-3-sonnet-20250302",
+        "claude-3-sonnet-20250303",
+        "claude-3-sonnet-20250304",
+        "claude-3-sonnet-20250305",
+        "claude-3-sonnet-20250306",
+        "claude-3-sonnet-20250307",
+        "claude-3-sonnet-20250308",
+        "claude-3-sonnet-20250309",
+        "claude-3-sonnet-20250310",
+        "claude-3-sonnet-20250311",
+        "claude-3-sonnet-20250312",
+        "claude-3-sonnet-20250313",
+        "claude-3-sonnet-20250314",
+        "claude-3-sonnet-20250315",
+    ]
+    
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PROBES)
+    model_name = await find_first_available(client, semaphore, sonnet_models)
+    if model_name:
+        print(f"\n✅ FOUND WORKING SONNET MODEL: {model_name}\n")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='Check for the latest Claude 3 Sonnet model')
+    parser.add_argument('--force-probe', action='store_true',
+                        help='Probe specific model names instead of listing models')
+    args = parser.parse_args()
+    
+    asyncio.run(main(force_probe=args.force_probe))
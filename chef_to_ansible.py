@@ -6,7 +6,9 @@ A tool that leverages Anthropic's Claude API to convert Chef cookbooks to Ansibl
 
 import os
 import sys
+import threading
 import click
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from src.repo_handler import GitRepoHandler
@@ -27,13 +29,16 @@ def cli():
 @click.option('--api-key', envvar='ANTHROPIC_API_KEY', help='Anthropic API key')
 @click.option('--model', default='claude-3-opus-20240229', help='Anthropic model to use')
 @click.option('--verbose', is_flag=True, help='Enable verbose output')
-def convert(repo_url, output_dir, api_key, model, verbose):
+@click.option('--no-cache', is_flag=True, help='Do not reuse cached LLM results from earlier runs')
+def convert(repo_url, output_dir, api_key, model, verbose, no_cache):
     """Convert a Chef repository to Ansible"""
     if not api_key:
         click.echo("Error: Anthropic API key is required. Set it with --api-key or ANTHROPIC_API_KEY environment variable.")
         sys.exit(1)
     
     config = Config(api_key=api_key, model=model, verbose=verbose)
+    if no_cache:
+        config.use_cache = False
     converter = ChefToAnsibleConverter(config)
     
     try:
@@ -56,6 +61,7 @@ class ChefToAnsibleConverter:
         self.llm_converter = LLMConverter(config)
         self.ansible_generator = AnsibleGenerator()
         self.validator = AnsibleValidator()
+        self._generator_lock = threading.Lock()
     
     def convert_repository(self, git_url, output_path):
         """Convert a Chef repository to Ansible"""
@@ -91,62 +97,91 @@ class ChefToAnsibleConverter:
             'details': []
         }
         
-        for i, cookbook in enumerate(cookbooks):
-            try:
-                if self.config.verbose:
-                    click.echo(f"Converting cookbook {i+1}/{len(cookbooks)}: {cookbook['name']}...")
-                
-                # Parse the cookbook
-                parsed_cookbook = self.chef_parser.parse_cookbook(cookbook['path'])
-                
-                if not parsed_cookbook['recipes']:
-                    if self.config.verbose:
-                        click.echo(f"No recipes found in cookbook {cookbook['name']}, skipping...")
-                    continue
-                
-                if self.config.verbose:
-                    click.echo(f"Found {len(parsed_cookbook['recipes'])} recipes in cookbook {cookbook['name']}")
-                
-                # Convert the cookbook to Ansible
-                ansible_code = self.llm_converter.convert_cookbook(parsed_cookbook)
-                
-                # Generate Ansible files
-                ansible_path = output_dir / cookbook['name']
-                self.ansible_generator.generate_ansible_role(ansible_code, ansible_path)
-                
-                # Validate the generated Ansible code
-                validation_result = self.validator.validate(ansible_path)
-                
-                results['details'].append({
-                    'cookbook': cookbook['name'],
-                    'success': validation_result['valid'],
-                    'messages': validation_result['messages']
-                })
-                
-                if validation_result['valid']:
-                    results['success_count'] += 1
-                    if self.config.verbose:
-                        click.echo(f"Successfully converted cookbook {cookbook['name']}")
-                else:
-                    results['failed_count'] += 1
-                    if self.config.verbose:
-                        click.echo(f"Cookbook {cookbook['name']} converted with validation issues: {validation_result['messages']}")
-            
-            except Exception as e:
-                if self.config.verbose:
-                    click.echo(f"Error converting cookbook {cookbook['name']}: {str(e)}")
-                
-                results['details'].append({
-                    'cookbook': cookbook['name'],
-                    'success': False,
-                    'messages': [str(e)]
-                })
+        # Convert cookbooks concurrently; each conversion is dominated by LLM round-trips,
+        # and the converter caps live API calls at max_concurrency across all of them
+        total = len(cookbooks)
+        with ThreadPoolExecutor(max_workers=max(1, self.config.max_concurrency)) as executor:
+            futures = [
+                executor.submit(self._convert_one, cookbook, i, total, output_dir)
+                for i, cookbook in enumerate(cookbooks)
+            ]
+        
+        for future in futures:
+            outcome = future.result()
+            if outcome is None:
+                continue
+            results['details'].append(outcome)
+            if outcome['success']:
+                results['success_count'] += 1
+            else:
                 results['failed_count'] += 1
         
         # Clean up temporary files
         self.repo_handler.cleanup(repo_path)
         
         return results
+    
+    def _convert_one(self, cookbook, index, total, output_dir):
+        """
+        Parse, convert, generate and validate a single cookbook
+        
+        Args:
+            cookbook (dict): Cookbook information from find_cookbooks
+            index (int): Position of the cookbook in the repository
+            total (int): Total number of cookbooks being converted
+            output_dir (Path): Directory to write the Ansible role to
+            
+        Returns:
+            dict: Result details for the cookbook, or None if it was skipped
+        """
+        try:
+            if self.config.verbose:
+                click.echo(f"Converting cookbook {index+1}/{total}: {cookbook['name']}...")
+            
+            # Parse the cookbook
+            parsed_cookbook = self.chef_parser.parse_cookbook(cookbook['path'])
+            
+            if not parsed_cookbook['recipes']:
+                if self.config.verbose:
+                    click.echo(f"No recipes found in cookbook {cookbook['name']}, skipping...")
+                return None
+            
+            if self.config.verbose:
+                click.echo(f"Found {len(parsed_cookbook['recipes'])} recipes in cookbook {cookbook['name']}")
+            
+            # Convert the cookbook to Ansible
+            ansible_code = self.llm_converter.convert_cookbook(parsed_cookbook)
+            
+            # Generate Ansible files
+            # Every role's _create_master_playbook rewrites the shared site.yml, so run it one at a time
+            ansible_path = output_dir / cookbook['name']
+            with self._generator_lock:
+                self.ansible_generator.generate_ansible_role(ansible_code, ansible_path)
+            
+            # Validate the generated Ansible code
+            validation_result = self.validator.validate(ansible_path)
+            
+            if self.config.verbose:
+                if validation_result['valid']:
+                    click.echo(f"Successfully converted cookbook {cookbook['name']}")
+                else:
+                    click.echo(f"Cookbook {cookbook['name']} converted with validation issues: {validation_result['messages']}")
+            
+            return {
+                'cookbook': cookbook['name'],
+                'success': validation_result['valid'],
+                'messages': validation_result['messages']
+            }
+        
+        except Exception as e:
+            if self.config.verbose:
+                click.echo(f"Error converting cookbook {cookbook['name']}: {str(e)}")
+            
+            return {
+                'cookbook': cookbook['name'],
+                'success': False,
+                'messages': [str(e)]
+            }
 
 if __name__ == '__main__':
     cli()
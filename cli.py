@@ -4,9 +4,13 @@ CLI for Chef to Ansible Converter
 """
 
 import argparse
+import contextlib
+import functools
+import logging
 import os
 import sys
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Optional
 from dotenv import load_dotenv
@@ -19,7 +23,36 @@ from src.validator import AnsibleValidator
 from src.logger import setup_logger, logger
 from src.repo_handler import GitRepoHandler
 
-def convert_cookbook(repo_path, output_path, api_key=None, model=None, verbose=False, feedback=None, prompt_enhancements=None):
+def iter_files(root):
+    """
+    Recursively yield the paths of all files below a directory
+    
+    Uses os.scandir so the file type of each entry comes from the directory
+    listing rather than a separate stat call.
+    
+    Args:
+        root (str or Path): Directory to walk
+    """
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_files(entry.path)
+            elif entry.is_file():
+                yield entry.path
+
+def parse_cookbook(cookbook_path):
+    """
+    Parse a single cookbook; a module-level function so worker processes can run it
+    
+    Args:
+        cookbook_path (str or Path): Path to the cookbook
+        
+    Returns:
+        dict: Parsed cookbook
+    """
+    return ChefParser().parse_cookbook(cookbook_path)
+
+def convert_cookbook(repo_path, output_path, api_key=None, model=None, verbose=False, feedback=None, prompt_enhancements=None, use_cache=True):
     """
     Convert a Chef cookbook to Ansible roles
     
@@ -30,6 +63,7 @@ def convert_cookbook(repo_path, output_path, api_key=None, model=None, verbose=F
         model (str): Anthropic model to use (optional)
         verbose (bool): Enable verbose output
         feedback (str): Path to feedback file from previous conversion (optional)
+        use_cache (bool): Reuse cached LLM results from earlier runs
     """
     # Process feedback content
     feedback_content = None
@@ -65,6 +99,11 @@ def convert_cookbook(repo_path, output_path, api_key=None, model=None, verbose=F
     )
     if model:
         config.model = model
+    if not use_cache:
+        config.use_cache = False
+    
+    # Per-template and per-file progress is logged at DEBUG, so honour --verbose
+    setup_logger('chef_to_ansible', config.log_file, logging.DEBUG if verbose else config.log_level)
     
     # Create output directory
     output_path = Path(output_path)
@@ -87,89 +126,100 @@ def convert_cookbook(repo_path, output_path, api_key=None, model=None, verbose=F
     for cookbook in cookbooks:
         logger.info(f"  - {cookbook['name']} at {cookbook['path']}")
     
-    # Process each cookbook
-    for cookbook_info in cookbooks:
-        cookbook_path = cookbook_info['path']
-        cookbook_name = cookbook_info['name']
+    # Create the converter once so every cookbook shares the same API client
+    converter = LLMConverter(config)
+    
+    # Cookbooks parse independently, so parse them in worker processes while the
+    # conversions below run one at a time; a single cookbook is parsed inline
+    # because starting a pool costs more than parsing it
+    if len(cookbooks) > 1:
+        pool = ProcessPoolExecutor(max_workers=min(len(cookbooks), os.cpu_count() or 1))
+    else:
+        pool = contextlib.nullcontext()
+    with pool as parse_pool:
+        if parse_pool is None:
+            parse_results = [functools.partial(parse_cookbook, cookbook_info['path']) for cookbook_info in cookbooks]
+        else:
+            parse_results = [parse_pool.submit(parse_cookbook, cookbook_info['path']).result for cookbook_info in cookbooks]
         
-        logger.info(f"Processing cookbook: {cookbook_name}")
-        
-        try:
-            # Parse the cookbook
-            parser = ChefParser()
-            cookbook = parser.parse_cookbook(cookbook_path)
-            
-            # Print cookbook details
-            logger.info(f"  - {len(cookbook['recipes'])} recipes")
-            logger.info(f"  - {len(cookbook.get('templates', []))} templates")
-            logger.info(f"  - {len(cookbook.get('attributes', []))} attribute files")
-            
-            # Convert the cookbook
-            logger.info(f"Converting cookbook {cookbook_name}...")
-            converter = LLMConverter(config)
+        # Process each cookbook
+        for cookbook_info, parse_result in zip(cookbooks, parse_results):
+            cookbook_path = cookbook_info['path']
+            cookbook_name = cookbook_info['name']
             
-            # Use the LLM to convert the Chef recipes to Ansible tasks, handlers, and variables
-            ansible_data = converter.convert_cookbook(cookbook, feedback_content)
+            logger.info(f"Processing cookbook: {cookbook_name}")
             
-            # Also convert templates from ERB to Jinja2
-            ansible_templates = converter.convert_templates(cookbook.get('templates', []))
-            ansible_data['templates'] = ansible_templates
-            
-            # Print conversion details
-            logger.info(f"Converted {len(ansible_data.get('tasks', []))} tasks")
-            logger.info(f"Converted {len(ansible_data.get('handlers', []))} handlers")
-            logger.info(f"Converted {len(ansible_data.get('variables', {}))} variables")
-            logger.info(f"Converted {len(ansible_templates)} templates:")
-            for i, template in enumerate(ansible_templates):
-                logger.info(f"  - Template {i+1}: {template.get('name', 'N/A')} -> {template.get('path', 'N/A')}")
-            
-            # Generate Ansible role
-            logger.info(f"Generating Ansible role for {cookbook_name}...")
-            generator = AnsibleGenerator()
-            role_path = output_path / cookbook_name
-            
-            generator.generate_ansible_role(ansible_data, role_path)
-            
-            # Check if templates directory exists and has content
-            templates_dir = role_path / 'templates'
-            logger.info(f"Checking templates directory: {templates_dir}")
-            
-            if templates_dir.exists():
-                template_files = list(templates_dir.glob('**/*'))
-                logger.info(f"Templates directory exists with {len(template_files)} files:")
-                for file in template_files:
-                    if file.is_file():
-                        logger.info(f"  - {file.relative_to(role_path)}")
-            else:
-                logger.info("Templates directory does not exist!")
-        except Exception as e:
-            logger.error(f"Failed to convert cookbook {cookbook_name}: {str(e)}")
-            continue
+            try:
+                # Wait for the cookbook to be parsed
+                cookbook = parse_result()
+                
+                # Print cookbook details
+                logger.info(f"  - {len(cookbook['recipes'])} recipes")
+                logger.info(f"  - {len(cookbook.get('templates', []))} templates")
+                logger.info(f"  - {len(cookbook.get('attributes', []))} attribute files")
+                
+                # Convert the cookbook
+                logger.info(f"Converting cookbook {cookbook_name}...")
+                
+                # Use the LLM to convert the Chef recipes to Ansible tasks, handlers, and variables
+                ansible_data = converter.convert_cookbook(cookbook, feedback_content)
+                
+                # Also convert templates from ERB to Jinja2
+                ansible_templates = converter.convert_templates(cookbook.get('templates', []))
+                ansible_data['templates'] = ansible_templates
+                
+                # Print conversion details
+                logger.info(f"Converted {len(ansible_data.get('tasks', []))} tasks")
+                logger.info(f"Converted {len(ansible_data.get('handlers', []))} handlers")
+                logger.info(f"Converted {len(ansible_data.get('variables', {}))} variables")
+                logger.info(f"Converted {len(ansible_templates)} templates:")
+                for i, template in enumerate(ansible_templates):
+                    logger.info(f"  - Template {i+1}: {template.get('name', 'N/A')} -> {template.get('path', 'N/A')}")
+                
+                # Generate Ansible role
+                logger.info(f"Generating Ansible role for {cookbook_name}...")
+                generator = AnsibleGenerator()
+                role_path = output_path / cookbook_name
+                
+                generator.generate_ansible_role(ansible_data, role_path)
+                
+                # Check if templates directory exists and has content
+                templates_dir = role_path / 'templates'
+                logger.info(f"Checking templates directory: {templates_dir}")
+                
+                if templates_dir.exists():
+                    log_files = logger.isEnabledFor(logging.DEBUG)
+                    template_count = 0
+                    for file_path in iter_files(templates_dir):
+                        if log_files:
+                            logger.debug(f"  - {os.path.relpath(file_path, role_path)}")
+                        template_count += 1
+                    logger.info(f"Templates directory exists with {template_count} files")
+                else:
+                    logger.info("Templates directory does not exist!")
+            except Exception as e:
+                logger.error(f"Failed to convert cookbook {cookbook_name}: {str(e)}")
+                continue
     
     # Create a zip file of the Ansible roles
     logger.info("\nCreating zip file...")
     zip_path = output_path / "ansible_roles.zip"
     
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk(output_path):
+    zipped_files = []
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
+        for file_path in iter_files(output_path):
+            # Calculate the relative path for the zip file
+            rel_path = os.path.relpath(file_path, output_path)
             # Skip the zip file itself
-            if zip_path.name in files:
-                files.remove(zip_path.name)
-                
-            for file in files:
-                file_path = os.path.join(root, file)
-                # Calculate the relative path for the zip file
-                rel_path = os.path.relpath(file_path, output_path)
-                logger.info(f"Adding to zip: {rel_path}")
-                zipf.write(file_path, rel_path)
-    
-    # Check the contents of the zip file
-    logger.info(f"\nChecking zip file contents: {zip_path}")
-    with zipfile.ZipFile(zip_path, 'r') as zipf:
-        zip_contents = zipf.namelist()
-        logger.info(f"Zip file contains {len(zip_contents)} files:")
-        for file in zip_contents:
-            logger.info(f"  - {file}")
+            if rel_path == zip_path.name:
+                continue
+            zipf.write(file_path, rel_path)
+            zipped_files.append(rel_path)
+        total_bytes = sum(info.file_size for info in zipf.infolist())
+    
+    logger.info(f"Zipped {len(zipped_files)} files ({total_bytes} bytes) to {zip_path}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("\n".join(f"  - {rel_path}" for rel_path in zipped_files))
     
     logger.info("\nConversion complete!")
 
@@ -185,14 +235,13 @@ def main():
     parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose output')
     parser.add_argument('--feedback', help='Path to feedback file from previous conversion')
     parser.add_argument('--prompt-enhancements', help='Path to prompt enhancements based on previous results')
+    parser.add_argument('--no-cache', action='store_true', help='Do not reuse cached LLM results from earlier runs')
     
     args = parser.parse_args()
     
-    convert_cookbook(args.repo_path, args.output_path, args.api_key, args.model, args.verbose, args.feedback, args.prompt_enhancements)
+    convert_cookbook(args.repo_path, args.output_path, args.api_key, args.model, args.verbose, args.feedback, args.prompt_enhancements, not args.no_cache)
 
 if __name__ == '__main__':
-    # Import logging here to avoid circular import issues
-    import logging
     try:
         main()
     except KeyboardInterrupt:
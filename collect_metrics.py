@@ -9,11 +9,154 @@ import sys
 import json
 import time
 import argparse
+import contextlib
+import io
 import datetime
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import yaml
 import re
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Use the libyaml C parser when it is available
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Matches Jinja variable references such as {{ var }}, {{ var.attr }} and {{ var | filter(arg) }}
+VAR_PATTERN = re.compile(r"{{\s*(\w+)(?:\.\w+)*\s*(?:\|\s*\w+(?:\(.*?\))?)*\s*}}")
+
+# Source spellings of YAML booleans that count as true/false usage; yes/no do not
+BOOLEAN_STRINGS = frozenset(("true", "false"))
+
+# Number of roles in a run from which analyzing them in worker processes pays for the pool start-up
+PARALLEL_ROLE_THRESHOLD = 16
+
+# Sidecar file caching per-file averages for generate_historical_data
+HISTORICAL_CACHE_FILE = "historical_cache.json"
+
+# Per-role compliance percentages that are averaged across runs
+COMPLIANCE_METRICS = (
+    "fqcn_compliance",
+    "capitalization_compliance",
+    "boolean_compliance",
+    "variable_definition_compliance"
+)
+
+def _read_json(path):
+    """
+    Read a JSON file, using orjson when it is installed
+    
+    Args:
+        path (Path): Path to the JSON file
+        
+    Returns:
+        Parsed JSON data
+    """
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r") as f:
+        return json.load(f)
+
+def _write_json(path, data):
+    """
+    Write data to a JSON file with 2-space indentation, using orjson when it is installed
+    
+    Args:
+        path (Path): Path to the JSON file
+        data: JSON-serializable data
+    """
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+def _count_top_level_items(path):
+    """
+    Count the items of a YAML file whose document is a top-level list
+    
+    Walks the parser events instead of building Python objects, which is
+    enough when only the number of entries is needed. Falls back to a full
+    load when the document is not a list.
+    
+    Args:
+        path (Path): Path to the YAML file
+        
+    Returns:
+        int: Number of top-level items, or 0 for an empty document
+    """
+    with open(path, "r") as f:
+        count = 0
+        depth = 0
+        for event in yaml.parse(f, Loader=YAML_LOADER):
+            if isinstance(event, (yaml.SequenceStartEvent, yaml.MappingStartEvent)):
+                if depth == 0 and isinstance(event, yaml.MappingStartEvent):
+                    break
+                if depth == 1:
+                    count += 1
+                depth += 1
+            elif isinstance(event, (yaml.SequenceEndEvent, yaml.MappingEndEvent)):
+                depth -= 1
+            elif isinstance(event, (yaml.ScalarEvent, yaml.AliasEvent)):
+                if depth == 0:
+                    break
+                if depth == 1:
+                    count += 1
+            elif isinstance(event, yaml.DocumentEndEvent):
+                return count
+        else:
+            return count
+    
+    with open(path, "r") as f:
+        data = yaml.load(f, Loader=YAML_LOADER)
+    return len(data) if data is not None else 0
+
+def _load_yaml_with_nodes(path):
+    """
+    Load a YAML file together with its node graph
+    
+    Scalar nodes keep the value as written in the file, so callers can tell
+    a literal `true` from a `yes` that the loader also turns into a bool.
+    
+    Args:
+        path (Path): Path to the YAML file
+        
+    Returns:
+        tuple: Parsed YAML data and root node, both None for an empty document
+    """
+    with open(path, "rb") as f:
+        loader = YAML_LOADER(f)
+        try:
+            node = loader.get_single_node()
+            data = loader.construct_document(node) if node is not None else None
+        finally:
+            loader.dispose()
+    return data, node
+
+def _iter_scalar_values(node):
+    """
+    Yield the source text of every scalar value nested inside a YAML node
+    
+    Args:
+        node (yaml.Node): Node to walk
+        
+    Yields:
+        str: Each scalar value as written in the file; mapping keys are skipped
+    """
+    if isinstance(node, yaml.MappingNode):
+        for _, value in node.value:
+            yield from _iter_scalar_values(value)
+    elif isinstance(node, yaml.SequenceNode):
+        for item in node.value:
+            yield from _iter_scalar_values(item)
+    else:
+        yield node.value
+
 class MetricsCollector:
     """Collects metrics from Chef to Ansible conversion runs"""
     
@@ -26,7 +169,8 @@ class MetricsCollector:
             "runs": []
         }
     
-    def analyze_ansible_role(self, role_dir):
+    @staticmethod
+    def analyze_ansible_role(role_dir):
         """
         Analyze an Ansible role for metrics
         
@@ -50,37 +194,42 @@ class MetricsCollector:
         
         # Analyze tasks
         tasks_file = role_dir / "tasks" / "main.yml"
+        task_vars = set()
         if tasks_file.exists():
             try:
-                with open(tasks_file, "r") as f:
-                    tasks_content = f.read()
-                    tasks = yaml.safe_load(tasks_content)
-                    if tasks is not None:
-                        role_metrics["task_count"] = len(tasks)
-                        
-                        # Check FQCN compliance
-                        fqcn_count = 0
-                        capitalized_count = 0
-                        boolean_count = 0
+                tasks, tasks_node = _load_yaml_with_nodes(tasks_file)
+                if tasks is not None:
+                    role_metrics["task_count"] = len(tasks)
+                    
+                    # Check FQCN, capitalization, boolean and variable usage in one pass
+                    fqcn_count = 0
+                    capitalized_count = 0
+                    boolean_count = 0
+                    
+                    task_nodes = tasks_node.value if isinstance(tasks_node, yaml.SequenceNode) else []
+                    for task, task_node in zip(tasks, task_nodes):
+                        # Check for FQCN
+                        if any(k.startswith("ansible.") for k in task.keys() if k != "name"):
+                            fqcn_count += 1
                         
-                        for task in tasks:
-                            # Check for FQCN
-                            if any(k.startswith("ansible.") for k in task.keys() if k != "name"):
-                                fqcn_count += 1
-                            
-                            # Check for capitalization in task names
-                            if "name" in task and task["name"][0].isupper():
-                                capitalized_count += 1
-                            
-                            # Check for true/false usage
-                            task_str = str(task)
-                            if "true" in task_str or "false" in task_str:
-                                boolean_count += 1
+                        # Check for capitalization in task names
+                        if "name" in task and task["name"][0].isupper():
+                            capitalized_count += 1
                         
-                        if role_metrics["task_count"] > 0:
-                            role_metrics["fqcn_compliance"] = fqcn_count / role_metrics["task_count"] * 100
-                            role_metrics["capitalization_compliance"] = capitalized_count / role_metrics["task_count"] * 100
-                            role_metrics["boolean_compliance"] = boolean_count / role_metrics["task_count"] * 100
+                        # Check for true/false spellings and collect variable references
+                        has_boolean = False
+                        for value in _iter_scalar_values(task_node):
+                            if not has_boolean and value.strip().lower() in BOOLEAN_STRINGS:
+                                has_boolean = True
+                            if "{{" in value:
+                                task_vars.update(VAR_PATTERN.findall(value))
+                        if has_boolean:
+                            boolean_count += 1
+                    
+                    if role_metrics["task_count"] > 0:
+                        role_metrics["fqcn_compliance"] = fqcn_count / role_metrics["task_count"] * 100
+                        role_metrics["capitalization_compliance"] = capitalized_count / role_metrics["task_count"] * 100
+                        role_metrics["boolean_compliance"] = boolean_count / role_metrics["task_count"] * 100
             except Exception as e:
                 print(f"Error analyzing tasks: {str(e)}")
         
@@ -88,11 +237,7 @@ class MetricsCollector:
         handlers_file = role_dir / "handlers" / "main.yml"
         if handlers_file.exists():
             try:
-                with open(handlers_file, "r") as f:
-                    handlers_content = f.read()
-                    handlers = yaml.safe_load(handlers_content)
-                    if handlers is not None:
-                        role_metrics["handler_count"] = len(handlers)
+                role_metrics["handler_count"] = _count_top_level_items(handlers_file)
             except Exception as e:
                 print(f"Error analyzing handlers: {str(e)}")
         
@@ -100,36 +245,29 @@ class MetricsCollector:
         defaults_file = role_dir / "defaults" / "main.yml"
         if defaults_file.exists():
             try:
-                with open(defaults_file, "r") as f:
-                    defaults_content = f.read()
-                    defaults = yaml.safe_load(defaults_content)
-                    if defaults is not None:
-                        role_metrics["variable_count"] = len(defaults)
+                with open(defaults_file, "rb") as f:
+                    defaults = yaml.load(f, Loader=YAML_LOADER)
+                if defaults is not None:
+                    role_metrics["variable_count"] = len(defaults)
+                    
+                    # Check variable definition compliance
+                    if role_metrics["task_count"] > 0:
+                        # Count how many referenced variables are defined
+                        defined_vars = set(defaults.keys()) if defaults else set()
+                        defined_var_count = len(task_vars.intersection(defined_vars))
                         
-                        # Check variable definition compliance
-                        if role_metrics["task_count"] > 0:
-                            # Extract variable references from tasks
-                            var_pattern = re.compile(r"{{\s*(\w+)(?:\.\w+)*\s*(?:\|\s*\w+(?:\(.*?\))?)*\s*}}")
-                            task_vars = set()
-                            
-                            with open(tasks_file, "r") as f:
-                                tasks_content = f.read()
-                                matches = var_pattern.findall(tasks_content)
-                                task_vars.update(matches)
-                            
-                            # Count how many referenced variables are defined
-                            defined_vars = set(defaults.keys()) if defaults else set()
-                            defined_var_count = len(task_vars.intersection(defined_vars))
-                            
-                            if len(task_vars) > 0:
-                                role_metrics["variable_definition_compliance"] = defined_var_count / len(task_vars) * 100
+                        if len(task_vars) > 0:
+                            role_metrics["variable_definition_compliance"] = defined_var_count / len(task_vars) * 100
             except Exception as e:
                 print(f"Error analyzing variables: {str(e)}")
         
         # Count templates
         templates_dir = role_dir / "templates"
         if templates_dir.exists():
-            role_metrics["template_count"] = len(list(templates_dir.glob("*.j2")))
+            with os.scandir(templates_dir) as entries:
+                role_metrics["template_count"] = sum(
+                    1 for entry in entries if entry.is_file() and entry.name.endswith(".j2")
+                )
         
         return role_metrics
     
@@ -153,11 +291,26 @@ class MetricsCollector:
         }
         
         # Find all roles in the output directory
-        for role_dir in output_dir.iterdir():
-            if role_dir.is_dir() and (role_dir / "tasks").exists():
-                role_metrics = self.analyze_ansible_role(role_dir)
-                run_metrics["roles"].append(role_metrics)
-                run_metrics["role_count"] += 1
+        with os.scandir(output_dir) as entries:
+            role_dirs = [
+                Path(entry.path) for entry in entries
+                if entry.is_dir() and os.path.exists(os.path.join(entry.path, "tasks"))
+            ]
+        
+        # Roles are independent, so analyze large runs in parallel
+        if len(role_dirs) >= PARALLEL_ROLE_THRESHOLD:
+            with ProcessPoolExecutor(max_workers=min(len(role_dirs), os.cpu_count() or 1)) as executor:
+                role_outputs = list(executor.map(_analyze_role_capturing_output, role_dirs))
+            role_results = []
+            for role_metrics, output in role_outputs:
+                # Print worker messages here, one role at a time, so they do not interleave
+                sys.stdout.write(output)
+                role_results.append(role_metrics)
+        else:
+            role_results = [self.analyze_ansible_role(role_dir) for role_dir in role_dirs]
+        
+        run_metrics["roles"].extend(role_results)
+        run_metrics["role_count"] = len(role_results)
         
         self.metrics["runs"].append(run_metrics)
         return run_metrics
@@ -179,8 +332,7 @@ class MetricsCollector:
         
         metrics_file = self.metrics_dir / filename
         
-        with open(metrics_file, "w") as f:
-            json.dump(self.metrics, f, indent=2)
+        _write_json(metrics_file, self.metrics)
         
         return metrics_file
     
@@ -191,70 +343,76 @@ class MetricsCollector:
         Returns:
             str: Summary text
         """
-        summary = []
-        summary.append("# Chef to Ansible Conversion Metrics Summary")
-        summary.append(f"Generated: {self.metrics['timestamp']}")
-        summary.append("")
-        
-        total_roles = sum(run["role_count"] for run in self.metrics["runs"])
-        total_tasks = sum(sum(role["task_count"] for role in run["roles"]) for run in self.metrics["runs"])
-        total_handlers = sum(sum(role["handler_count"] for role in run["roles"]) for run in self.metrics["runs"])
-        total_templates = sum(sum(role["template_count"] for role in run["roles"]) for run in self.metrics["runs"])
-        
-        summary.append(f"Total Cookbooks: {len(self.metrics['runs'])}")
-        summary.append(f"Total Roles: {total_roles}")
-        summary.append(f"Total Tasks: {total_tasks}")
-        summary.append(f"Total Handlers: {total_handlers}")
-        summary.append(f"Total Templates: {total_templates}")
-        summary.append("")
+        return "\n".join(self._iter_summary_lines())
+    
+    def _iter_summary_lines(self):
+        """
+        Generate the lines of the metrics summary
+        
+        Yields:
+            str: Each line of the summary text
+        """
+        yield "# Chef to Ansible Conversion Metrics Summary"
+        yield f"Generated: {self.metrics['timestamp']}"
+        yield ""
+        
+        # Accumulate totals and task-weighted compliance sums in a single pass
+        total_roles = 0
+        total_tasks = 0
+        total_handlers = 0
+        total_templates = 0
+        weighted = dict.fromkeys(COMPLIANCE_METRICS, 0.0)
+        for run in self.metrics["runs"]:
+            total_roles += run["role_count"]
+            for role in run["roles"]:
+                task_count = role["task_count"]
+                total_tasks += task_count
+                total_handlers += role["handler_count"]
+                total_templates += role["template_count"]
+                for metric in COMPLIANCE_METRICS:
+                    weighted[metric] += role[metric] * task_count
+        
+        yield f"Total Cookbooks: {len(self.metrics['runs'])}"
+        yield f"Total Roles: {total_roles}"
+        yield f"Total Tasks: {total_tasks}"
+        yield f"Total Handlers: {total_handlers}"
+        yield f"Total Templates: {total_templates}"
+        yield ""
         
         # Calculate compliance averages
         if total_roles > 0:
-            avg_fqcn = sum(
-                sum(role["fqcn_compliance"] * role["task_count"] for role in run["roles"]) 
-                for run in self.metrics["runs"]
-            ) / total_tasks if total_tasks > 0 else 0
-            
-            avg_cap = sum(
-                sum(role["capitalization_compliance"] * role["task_count"] for role in run["roles"]) 
-                for run in self.metrics["runs"]
-            ) / total_tasks if total_tasks > 0 else 0
-            
-            avg_bool = sum(
-                sum(role["boolean_compliance"] * role["task_count"] for role in run["roles"]) 
-                for run in self.metrics["runs"]
-            ) / total_tasks if total_tasks > 0 else 0
+            averages = {
+                metric: weighted[metric] / total_tasks if total_tasks > 0 else 0
+                for metric in COMPLIANCE_METRICS
+            }
+            avg_fqcn = averages["fqcn_compliance"]
+            avg_cap = averages["capitalization_compliance"]
+            avg_bool = averages["boolean_compliance"]
+            avg_var_def = averages["variable_definition_compliance"]
             
-            avg_var_def = sum(
-                sum(role["variable_definition_compliance"] * role["task_count"] for role in run["roles"]) 
-                for run in self.metrics["runs"]
-            ) / total_tasks if total_tasks > 0 else 0
-            
-            summary.append("## Compliance Metrics")
-            summary.append(f"- FQCN Compliance: {avg_fqcn:.2f}%")
-            summary.append(f"- Task Name Capitalization: {avg_cap:.2f}%")
-            summary.append(f"- Boolean Values (true/false): {avg_bool:.2f}%")
-            summary.append(f"- Variable Definition: {avg_var_def:.2f}%")
-            summary.append("")
+            yield "## Compliance Metrics"
+            yield f"- FQCN Compliance: {avg_fqcn:.2f}%"
+            yield f"- Task Name Capitalization: {avg_cap:.2f}%"
+            yield f"- Boolean Values (true/false): {avg_bool:.2f}%"
+            yield f"- Variable Definition: {avg_var_def:.2f}%"
+            yield ""
         
         # Per-run metrics
-        summary.append("## Per-Cookbook Metrics")
+        yield "## Per-Cookbook Metrics"
         for run in self.metrics["runs"]:
-            summary.append(f"### {run['cookbook_name']}")
-            summary.append(f"- Execution Time: {run['execution_time']:.2f} seconds")
-            summary.append(f"- Generated Roles: {run['role_count']}")
+            yield f"### {run['cookbook_name']}"
+            yield f"- Execution Time: {run['execution_time']:.2f} seconds"
+            yield f"- Generated Roles: {run['role_count']}"
             
             for role in run["roles"]:
-                summary.append(f"  - {role['name']}: {role['task_count']} tasks, {role['handler_count']} handlers, {role['variable_count']} variables")
+                yield f"  - {role['name']}: {role['task_count']} tasks, {role['handler_count']} handlers, {role['variable_count']} variables"
                 if role['task_count'] > 0:
-                    summary.append(f"    - FQCN Compliance: {role['fqcn_compliance']:.2f}%")
-                    summary.append(f"    - Task Name Capitalization: {role['capitalization_compliance']:.2f}%")
-                    summary.append(f"    - Boolean Values (true/false): {role['boolean_compliance']:.2f}%")
-                    summary.append(f"    - Variable Definition: {role['variable_definition_compliance']:.2f}%")
+                    yield f"    - FQCN Compliance: {role['fqcn_compliance']:.2f}%"
+                    yield f"    - Task Name Capitalization: {role['capitalization_compliance']:.2f}%"
+                    yield f"    - Boolean Values (true/false): {role['boolean_compliance']:.2f}%"
+                    yield f"    - Variable Definition: {role['variable_definition_compliance']:.2f}%"
             
-            summary.append("")
-        
-        return "\n".join(summary)
+            yield ""
     
     def save_summary(self, filename=None):
         """
@@ -274,14 +432,76 @@ class MetricsCollector:
         summary_file = self.metrics_dir / filename
         
         with open(summary_file, "w") as f:
-            f.write(self.generate_summary())
+            for index, line in enumerate(self._iter_summary_lines()):
+                if index:
+                    f.write("\n")
+                f.write(line)
         
         return summary_file
     
+    def _load_cache(self):
+        """
+        Load the historical data cache
+        
+        Returns:
+            dict: Cached per-file averages keyed by metrics file name
+        """
+        cache_file = self.metrics_dir / HISTORICAL_CACHE_FILE
+        if not cache_file.exists():
+            return {}
+        try:
+            return _read_json(cache_file)
+        except Exception as e:
+            print(f"Ignoring unreadable historical cache {cache_file}: {str(e)}")
+            return {}
+    
+    def _save_cache(self, cache):
+        """
+        Save the historical data cache
+        
+        Args:
+            cache (dict): Cached per-file averages keyed by metrics file name
+        """
+        cache_file = self.metrics_dir / HISTORICAL_CACHE_FILE
+        try:
+            _write_json(cache_file, cache)
+        except Exception as e:
+            print(f"Error saving historical cache {cache_file}: {str(e)}")
+    
+    @staticmethod
+    def _aggregate_run_averages(metrics):
+        """
+        Calculate task-weighted compliance averages for one metrics file
+        
+        Args:
+            metrics (dict): Contents of a metrics file
+            
+        Returns:
+            dict: Averages keyed by compliance metric, or None if there are no tasks
+        """
+        total_tasks = 0
+        weighted = dict.fromkeys(COMPLIANCE_METRICS, 0.0)
+        for run in metrics["runs"]:
+            for role in run["roles"]:
+                task_count = role["task_count"]
+                total_tasks += task_count
+                for metric in COMPLIANCE_METRICS:
+                    weighted[metric] += role.get(metric, 0) * task_count
+        
+        if total_tasks == 0:
+            return None
+        
+        averages = {metric: weighted[metric] / total_tasks for metric in COMPLIANCE_METRICS}
+        
+        return averages
+    
     def generate_historical_data(self):
         """
         Generate historical data from all metrics files
         
+        Averages for each metrics file are cached in a sidecar file keyed by
+        file name and modification time, so only new or changed files are parsed.
+        
         Returns:
             dict: Historical metrics data
         """
@@ -293,47 +513,53 @@ class MetricsCollector:
             "variable_definition_compliance": []
         }
         
+        cache = self._load_cache()
+        updated_cache = {}
+        
         for metrics_file in sorted(self.metrics_dir.glob("metrics_*.json")):
             try:
-                with open(metrics_file, "r") as f:
-                    metrics = json.load(f)
+                mtime = metrics_file.stat().st_mtime_ns
+                entry = cache.get(metrics_file.name)
                 
-                if "timestamp" in metrics and "runs" in metrics and metrics["runs"]:
-                    historical_data["timestamps"].append(metrics["timestamp"])
+                if entry is None or entry.get("mtime") != mtime:
+                    metrics = _read_json(metrics_file)
                     
-                    # Calculate averages for this metrics file
-                    total_tasks = sum(sum(role["task_count"] for role in run["roles"]) for run in metrics["runs"])
+                    entry = {"mtime": mtime, "timestamp": None, "averages": None}
+                    if "timestamp" in metrics and "runs" in metrics and metrics["runs"]:
+                        entry["timestamp"] = metrics["timestamp"]
+                        entry["averages"] = self._aggregate_run_averages(metrics)
+                
+                updated_cache[metrics_file.name] = entry
+                
+                if entry["timestamp"] is not None:
+                    historical_data["timestamps"].append(entry["timestamp"])
                     
-                    if total_tasks > 0:
-                        avg_fqcn = sum(
-                            sum(role.get("fqcn_compliance", 0) * role["task_count"] for role in run["roles"]) 
-                            for run in metrics["runs"]
-                        ) / total_tasks
-                        
-                        avg_cap = sum(
-                            sum(role.get("capitalization_compliance", 0) * role["task_count"] for role in run["roles"]) 
-                            for run in metrics["runs"]
-                        ) / total_tasks
-                        
-                        avg_bool = sum(
-                            sum(role.get("boolean_compliance", 0) * role["task_count"] for role in run["roles"]) 
-                            for run in metrics["runs"]
-                        ) / total_tasks
-                        
-                        avg_var_def = sum(
-                            sum(role.get("variable_definition_compliance", 0) * role["task_count"] for role in run["roles"]) 
-                            for run in metrics["runs"]
-                        ) / total_tasks
-                        
-                        historical_data["fqcn_compliance"].append(avg_fqcn)
-                        historical_data["capitalization_compliance"].append(avg_cap)
-                        historical_data["boolean_compliance"].append(avg_bool)
-                        historical_data["variable_definition_compliance"].append(avg_var_def)
+                    if entry["averages"] is not None:
+                        for metric in COMPLIANCE_METRICS:
+                            historical_data[metric].append(entry["averages"][metric])
             except Exception as e:
                 print(f"Error processing metrics file {metrics_file}: {str(e)}")
         
+        if updated_cache != cache:
+            self._save_cache(updated_cache)
+        
         return historical_data
 
+def _analyze_role_capturing_output(role_dir):
+    """
+    Analyze a role in a worker process, capturing what it prints
+    
+    Args:
+        role_dir (Path): Path to the Ansible role directory
+        
+    Returns:
+        tuple: Metrics for the role and the text printed while analyzing it
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        role_metrics = MetricsCollector.analyze_ansible_role(role_dir)
+    return role_metrics, output.getvalue()
+
 def main():
     parser = argparse.ArgumentParser(description='Collect metrics from Chef to Ansible conversion runs')
     parser.add_argument('--output-dir', type=str, default='ansible_roles', help='Directory containing the output Ansible roles')
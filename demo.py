@@ -5,12 +5,19 @@ Demo script for the Chef to Ansible converter
 
 import os
 import sys
+import re
 import argparse
 from pathlib import Path
-import yaml
 
-from src.config import Config
-from src.llm_converter import LLMConverter
+# Body of a fenced block: everything up to the closing ``` without lazy-dot backtracking
+FENCE_BODY = r'([^`]*(?:`(?!``)[^`]*)*)'
+
+# Fenced YAML blocks following "# Tasks" / "# Handlers" headers in the LLM response
+TASKS_SECTION_PATTERN = re.compile(r'#\s*Tasks[^\n]*\n\s*```(?:yaml|yml)?\s*' + FENCE_BODY + '```', re.IGNORECASE)
+HANDLERS_SECTION_PATTERN = re.compile(r'#\s*Handlers[^\n]*\n\s*```(?:yaml|yml)?\s*' + FENCE_BODY + '```', re.IGNORECASE)
+
+# Any fenced YAML block, used when the headers are missing
+YAML_BLOCK_PATTERN = re.compile(r'```(?:yaml|yml)\s*' + FENCE_BODY + '```')
 
 def main():
     parser = argparse.ArgumentParser(description='Demo Chef to Ansible conversion')
@@ -38,6 +45,11 @@ def main():
     with open(chef_file, 'r') as f:
         chef_content = f.read()
     
+    # Import the converter stack only once the arguments have been validated
+    import yaml
+    from src.config import Config
+    from src.llm_converter import LLMConverter
+    
     # Create mock recipe data
     recipe = {
         'name': chef_file.stem,
@@ -59,11 +71,9 @@ def main():
         # Write tasks to output file
         output_file = Path(args.output_file)
         
-        # Create a nicer YAML dump
-        from ruamel.yaml import YAML
-        yaml_writer = YAML()
-        yaml_writer.indent(mapping=2, sequence=4, offset=2)
-        yaml_writer.preserve_quotes = True
+        # Write the output with the same emitter the role generator uses
+        from src.ansible_generator import YAMLWriter
+        yaml_writer = YAMLWriter()
         
         # Process the response to extract tasks and handlers more reliably
         response = converter.client.messages.create(
@@ -104,31 +114,28 @@ Format your response like this:
         print(response_text)
         print("\n")
         
-        # Extract tasks and handlers using regex
-        import re
-        
         # Look for sections labeled as tasks and handlers
-        tasks_section = re.search(r'#\s*Tasks[^\n]*\n\s*```(?:yaml|yml)?\s*(.*?)```', response_text, re.DOTALL | re.IGNORECASE)
-        handlers_section = re.search(r'#\s*Handlers[^\n]*\n\s*```(?:yaml|yml)?\s*(.*?)```', response_text, re.DOTALL | re.IGNORECASE)
+        tasks_section = TASKS_SECTION_PATTERN.search(response_text)
+        handlers_section = HANDLERS_SECTION_PATTERN.search(response_text)
         
         if tasks_section:
             tasks_content = tasks_section.group(1).strip()
         else:
             # Fallback to finding the first YAML block
-            first_block = re.search(r'```(?:yaml|yml)\s*(.*?)```', response_text, re.DOTALL)
+            first_block = YAML_BLOCK_PATTERN.search(response_text)
             tasks_content = first_block.group(1).strip() if first_block else ""
             
         if handlers_section:
             handlers_content = handlers_section.group(1).strip()
         else:
             # Fallback to finding the second YAML block
-            yaml_blocks = re.findall(r'```(?:yaml|yml)\s*(.*?)```', response_text, re.DOTALL)
+            yaml_blocks = YAML_BLOCK_PATTERN.findall(response_text)
             handlers_content = yaml_blocks[1].strip() if len(yaml_blocks) > 1 else ""
         
         # Parse YAML content
-        import yaml
-        tasks = yaml.safe_load(tasks_content) or []
-        handlers = yaml.safe_load(handlers_content) or []
+        yaml_loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        tasks = yaml.load(tasks_content, Loader=yaml_loader) or []
+        handlers = yaml.load(handlers_content, Loader=yaml_loader) or []
         
         # Write to output file
         with open(output_file, 'w') as f:
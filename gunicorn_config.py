@@ -2,10 +2,13 @@
 import os
 
 bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
-workers = 2
+# Conversion progress lives in the worker process that started the conversion,
+# so the /progress stream must reach that same process: run a single worker and
+# serve concurrent requests from its threads until progress moves to a shared store
+workers = 1
 timeout = 120  # Increased timeout for longer conversions
-worker_class = "gevent"
-threads = 4
+worker_class = os.environ.get("WORKER_CLASS", "gthread")
+threads = int(os.environ.get("THREADS", 16))
 accesslog = "-"
 errorlog = "-"
 loglevel = "info"
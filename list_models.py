@@ -5,9 +5,32 @@ Script to list available models from the Anthropic API
 
 import os
 import sys
+import asyncio
 import anthropic
 
-def main():
+from src.api_client import get_async_client
+
+async def probe_model(client, model):
+    """
+    Probe a single model name
+
+    Returns:
+        tuple: The model name and the error raised, or None if it is available
+    """
+    try:
+        # Just create a simple message to see if the model exists
+        await client.messages.create(
+            model=model,
+            max_tokens=10,
+            messages=[
+                {"role": "user", "content": "Hello"}
+            ]
+        )
+        return model, None
+    except Exception as e:
+        return model, e
+
+async def main():
     # Get API key from environment
     api_key = os.environ.get('ANTHROPIC_API_KEY')
     if not api_key:
@@ -15,7 +38,7 @@ def main():
         sys.exit(1)
     
     # Initialize Anthropic client
-    client = anthropic.Anthropic(api_key=api_key)
+    client = get_async_client(api_key)
     
     try:
         # Print client information
@@ -40,23 +63,16 @@ def main():
         ]
         
         print("\nTesting models:")
-        for model in models_to_try:
-            try:
-                print(f"Testing model: {model}...", end=" ")
-                # Just create a simple message to see if the model exists
-                client.messages.create(
-                    model=model,
-                    max_tokens=10,
-                    messages=[
-                        {"role": "user", "content": "Hello"}
-                    ]
-                )
-                print("✓ Available")
-            except Exception as e:
-                print(f"✗ Error: {str(e)}")
+        # Probe every model concurrently and report the results in order
+        results = await asyncio.gather(*[probe_model(client, model) for model in models_to_try])
+        for model, error in results:
+            if error is None:
+                print(f"Testing model: {model}... ✓ Available")
+            else:
+                print(f"Testing model: {model}... ✗ Error: {str(error)}")
         
     except Exception as e:
         print(f"Error: {str(e)}")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -6,7 +6,6 @@ Run the Chef to Ansible Converter Web UI
 import os
 import sys
 import argparse
-from web.app import app
 
 def main():
     parser = argparse.ArgumentParser(description='Run the Chef to Ansible Converter Web UI')
@@ -21,6 +20,9 @@ def main():
     if args.api_key:
         os.environ['ANTHROPIC_API_KEY'] = args.api_key
     
+    # Import the web app after the API key is set so --help stays fast
+    from web.app import app
+    
     # Configure logging
     import logging
     log_level = getattr(logging, args.log_level)
@@ -6,19 +6,100 @@ import os
 from pathlib import Path
 
 import yaml
-from ruamel.yaml import YAML
 
 from src.logger import logger
 
+# Use the libyaml C emitter when it is available
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# README.md written into every generated role
+README_TEMPLATE = """# {cookbook_name}
+
+Ansible role converted from Chef cookbook {cookbook_name}.
+
+## Requirements
+
+- Ansible 2.9 or higher
+- Python 3.6 or higher on the control node
+
+## Role Variables
+
+### Default Variables
+
+These variables are defined in `defaults/main.yml` and can be overridden by the user:
+
+```yaml
+# Include a sample of the most important variables here
+```
+
+### Internal Variables
+
+These variables are defined in `vars/main.yml` and are used internally by the role:
+
+```yaml
+# Include a sample of internal variables here
+```
+
+## Dependencies
+
+None.
+
+## Example Playbook
+
+```yaml
+- hosts: servers
+  vars:
+    # Example variable overrides
+    {role_name}_custom_var: custom_value
+  roles:
+    - {role_name}
+```
+
+## Usage with Tags
+
+This role uses tags to allow running specific parts of the configuration:
+
+```bash
+# Run only tasks tagged with 'config'
+ansible-playbook -i inventory site.yml --tags {role_name},config
+
+# Skip tasks tagged with 'service'
+ansible-playbook -i inventory site.yml --skip-tags service
+```
+
+## License
+
+MIT
+
+## Author Information
+
+This role was converted from a Chef cookbook by the Chef to Ansible Converter.
+
+## Conversion Notes
+
+This role was automatically generated from a Chef cookbook. Some manual adjustments may be needed for optimal performance.
+"""
+
+class YAMLWriter:
+    """Writes YAML documents using the fastest available safe dumper"""
+    
+    def dump(self, data, stream):
+        """
+        Dump data as block-style YAML
+        
+        Args:
+            data: Data to write
+            stream: File object to write to
+        """
+        yaml.dump(data, stream, Dumper=YAML_DUMPER, default_flow_style=False,
+                  sort_keys=False, indent=2, allow_unicode=True)
+
 class AnsibleGenerator:
     """Generates Ansible playbooks and roles from converted Chef code"""
     
     def __init__(self):
         """Initialize the Ansible generator"""
-        # Use ruamel.yaml for better YAML formatting
-        self.yaml = YAML()
-        self.yaml.indent(mapping=2, sequence=4, offset=2)
-        self.yaml.preserve_quotes = True
+        self.yaml = YAMLWriter()
     
     def generate_ansible_role(self, ansible_data, output_path):
         """
@@ -30,15 +111,26 @@ class AnsibleGenerator:
         """
         # Create role directory structure
         role_path = Path(output_path) if isinstance(output_path, str) else output_path
-        role_path.mkdir(parents=True, exist_ok=True)
         
         # Get the cookbook name or use a default value if not present
         cookbook_name = ansible_data.get('name', os.path.basename(str(output_path)))
         role_name = cookbook_name.replace('-', '_').lower()
         
+        # Collect every directory the role needs, including template and file
+        # subdirectories, so each one is created exactly once
+        role_dirs = dict.fromkeys(
+            role_path / dir_name
+            for dir_name in ['tasks', 'handlers', 'templates', 'files', 'vars', 'defaults', 'meta']
+        )
+        for template in ansible_data.get('templates') or []:
+            if 'path' in template and 'content' in template:
+                role_dirs[(role_path / 'templates' / template['path']).parent] = None
+        for file_data in ansible_data.get('files') or []:
+            role_dirs[(role_path / 'files' / file_data['path']).parent] = None
+        
         # Create directories
-        for dir_name in ['tasks', 'handlers', 'templates', 'files', 'vars', 'defaults', 'meta']:
-            (role_path / dir_name).mkdir(exist_ok=True)
+        for dir_path in role_dirs:
+            dir_path.mkdir(parents=True, exist_ok=True)
         
         # Write tasks
         if ansible_data['tasks']:
@@ -61,6 +153,7 @@ class AnsibleGenerator:
         
         # Write templates
         if 'templates' in ansible_data and ansible_data['templates']:
+            created_templates = 0
             for template in ansible_data['templates']:
                 # Make sure template has the required fields
                 if 'path' not in template or 'content' not in template:
@@ -73,21 +166,18 @@ class AnsibleGenerator:
                 
                 # Create the full path in the role's templates directory
                 template_path = role_path / 'templates' / template_rel_path
-                template_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                logger.info(f"Creating template at: {template_path}")
                 
                 # Write template content
                 try:
-                    with open(template_path, 'w') as f:
-                        f.write(template['content'])
-                    logger.info(f"Created template: {template_path}")
+                    template_path.write_text(template['content'], encoding='utf-8')
+                    created_templates += 1
                 except Exception as e:
                     logger.error(f"Error creating template {template_path}: {str(e)}")
+            
+            logger.info(f"Created {created_templates} templates in {role_path / 'templates'}")
                     
             # Create a sample template if none were provided
-            if not any(os.path.exists(role_path / 'templates' / template['path']) 
-                      for template in ansible_data['templates'] if 'path' in template):
+            if not created_templates:
                 sample_template_path = role_path / 'templates' / 'sample.j2'
                 with open(sample_template_path, 'w') as f:
                     f.write("# Sample template for {{ role_name }}\n\n# This is a placeholder template file.\n")
@@ -97,7 +187,6 @@ class AnsibleGenerator:
         if 'files' in ansible_data and ansible_data['files']:
             for file_data in ansible_data['files']:
                 file_path = role_path / 'files' / file_data['path']
-                file_path.parent.mkdir(parents=True, exist_ok=True)
                 # In a real implementation, we would copy the file content
                 # Here we just create an empty file as a placeholder
                 file_path.touch()
@@ -134,72 +223,7 @@ class AnsibleGenerator:
         self._create_master_playbook(role_path.parent, role_name)
         
         # Create README.md with more comprehensive documentation
-        readme_content = f"""# {cookbook_name}
-
-Ansible role converted from Chef cookbook {cookbook_name}.
-
-## Requirements
-
-- Ansible 2.9 or higher
-- Python 3.6 or higher on the control node
-
-## Role Variables
-
-### Default Variables
-
-These variables are defined in `defaults/main.yml` and can be overridden by the user:
-
-```yaml
-# Include a sample of the most important variables here
-```
-
-### Internal Variables
-
-These variables are defined in `vars/main.yml` and are used internally by the role:
-
-```yaml
-# Include a sample of internal variables here
-```
-
-## Dependencies
-
-None.
-
-## Example Playbook
-
-```yaml
-- hosts: servers
-  vars:
-    # Example variable overrides
-    {role_name}_custom_var: custom_value
-  roles:
-    - {role_name}
-```
-
-## Usage with Tags
-
-This role uses tags to allow running specific parts of the configuration:
-
-```bash
-# Run only tasks tagged with 'config'
-ansible-playbook -i inventory site.yml --tags {role_name},config
-
-# Skip tasks tagged with 'service'
-ansible-playbook -i inventory site.yml --skip-tags service
-```
-
-## License
-
-MIT
-
-## Author Information
-
-This role was converted from a Chef cookbook by the Chef to Ansible Converter.
-
-## Conversion Notes
-
-This role was automatically generated from a Chef cookbook. Some manual adjustments may be needed for optimal performance.
-"""
+        readme_content = README_TEMPLATE.format(cookbook_name=cookbook_name, role_name=role_name)
         with open(role_path / 'README.md', 'w') as f:
             f.write(readme_content)
     
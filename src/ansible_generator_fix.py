@@ -3,10 +3,41 @@ Fix for AnsibleGenerator to handle variables properly
 """
 
 import re
-import json
 import os
 from pathlib import Path
 
+import yaml
+
+from src.logger import logger
+
+# Use the libyaml C parser and emitter when they are available
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Matches simple Jinja variable references such as {{ variable }}
+VAR_PATTERN = re.compile(r'{{\s*([a-zA-Z0-9_]+)\s*}}')
+
+def _iter_variable_refs(value):
+    """
+    Yield variable names referenced in the string keys and values of task data
+    
+    Args:
+        value: Task data (dict, list or scalar)
+        
+    Yields:
+        str: Each referenced variable name
+    """
+    if isinstance(value, str):
+        if '{{' in value:
+            yield from VAR_PATTERN.findall(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from _iter_variable_refs(key)
+            yield from _iter_variable_refs(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_variable_refs(item)
+
 def extract_task_variables(tasks):
     """
     Extract variable names from Ansible tasks
@@ -17,16 +48,12 @@ def extract_task_variables(tasks):
     Returns:
         set: Set of variable names
     """
-    # Convert tasks to string for regex
-    tasks_str = json.dumps(tasks)
-    
-    # Find all {{ variable }} patterns
-    pattern = r'{{\s*([a-zA-Z0-9_]+)\s*}}'
-    matches = re.findall(pattern, tasks_str)
+    # Find all {{ variable }} patterns in the task values
+    matches = set(_iter_variable_refs(tasks))
     
     # Filter out Ansible built-in variables
     ansible_vars = {'ansible_check_mode', 'ansible_facts'}
-    return {var for var in matches if var not in ansible_vars}
+    return matches - ansible_vars
 
 def ensure_variables_defined(ansible_data, defaults_file):
     """
@@ -38,14 +65,13 @@ def ensure_variables_defined(ansible_data, defaults_file):
     """
     # Read existing defaults
     if defaults_file.exists():
-        with open(defaults_file, 'r') as f:
-            content = f.read()
-            
         # Parse YAML content
-        import yaml
         try:
-            default_vars = yaml.safe_load(content) or {}
-        except:
+            with open(defaults_file, 'r') as f:
+                default_vars = yaml.load(f, Loader=YAML_LOADER)
+            if not isinstance(default_vars, dict):
+                default_vars = {}
+        except (OSError, yaml.YAMLError):
             default_vars = {}
     else:
         default_vars = {}
@@ -81,6 +107,6 @@ def ensure_variables_defined(ansible_data, defaults_file):
     if updated:
         defaults_file.parent.mkdir(parents=True, exist_ok=True)
         with open(defaults_file, 'w') as f:
-            yaml.dump(default_vars, f, default_flow_style=False)
+            yaml.dump(default_vars, f, Dumper=YAML_DUMPER, default_flow_style=False)
         
-        print(f"Updated defaults file with missing variables: {defaults_file}")
+        logger.info(f"Updated defaults file with missing variables: {defaults_file}")
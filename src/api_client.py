@@ -0,0 +1,85 @@
+"""
+Shared Anthropic API connection pools for the Chef to Ansible converter
+"""
+
+import threading
+
+import anthropic
+import httpx
+
+# Connection pool sizing for requests to the Anthropic API
+MAX_KEEPALIVE_CONNECTIONS = 32
+MAX_CONNECTIONS = 64
+
+_http_client = None
+_async_http_client = None
+_lock = threading.Lock()
+
+
+def _connection_limits():
+    """Connection pool limits shared by the sync and async clients"""
+    return httpx.Limits(
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        max_connections=MAX_CONNECTIONS
+    )
+
+
+def get_http_client():
+    """
+    Get the process-wide HTTP client used for Anthropic API calls
+
+    Returns:
+        httpx.Client: Shared keep-alive HTTP client
+    """
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = anthropic.DefaultHttpxClient(limits=_connection_limits())
+        return _http_client
+
+
+def get_async_http_client():
+    """
+    Get the process-wide async HTTP client used for Anthropic API calls
+
+    The async connection pool is bound to the event loop it is first used
+    on, so this is meant for scripts that run a single asyncio.run().
+
+    Returns:
+        httpx.AsyncClient: Shared keep-alive async HTTP client
+    """
+    global _async_http_client
+    with _lock:
+        if _async_http_client is None:
+            _async_http_client = anthropic.DefaultAsyncHttpxClient(limits=_connection_limits())
+        return _async_http_client
+
+
+def get_client(api_key, max_retries=anthropic.DEFAULT_MAX_RETRIES):
+    """
+    Create an Anthropic client backed by the shared connection pool
+
+    Every client returned here reuses the same keep-alive connections, so
+    repeated calls reuse an existing TLS session instead of opening a new one.
+
+    Args:
+        api_key (str): Anthropic API key
+        max_retries (int): Number of automatic retries the SDK makes per request
+
+    Returns:
+        anthropic.Anthropic: Client instance
+    """
+    return anthropic.Anthropic(api_key=api_key, http_client=get_http_client(), max_retries=max_retries)
+
+
+def get_async_client(api_key):
+    """
+    Create an async Anthropic client backed by the shared connection pool
+
+    Args:
+        api_key (str): Anthropic API key
+
+    Returns:
+        anthropic.AsyncAnthropic: Async client instance
+    """
+    return anthropic.AsyncAnthropic(api_key=api_key, http_client=get_async_http_client())
@@ -5,8 +5,124 @@ Chef parser module for the Chef to Ansible converter
 import os
 import re
 import json
+import mmap
+import functools
 from pathlib import Path
 
+try:
+    # Optional linear-time regex engine for scanning recipe bodies
+    import re2
+except ImportError:
+    re2 = None
+
+# Common Chef resource types
+RESOURCE_TYPES = (
+    'package', 'service', 'template', 'cookbook_file', 'file', 'directory',
+    'execute', 'bash', 'ruby_block', 'cron', 'user', 'group', 'mount',
+    'remote_file', 'git', 'apt_repository', 'yum_repository', 'apt_update'
+)
+
+# Directories never searched for cookbooks
+SKIPPED_SCAN_DIRS = frozenset(('.git', 'node_modules', '.venv', '__pycache__'))
+
+# Metadata attributes extracted from metadata.rb, each written as: attr 'value'
+METADATA_ATTRIBUTES = ('name', 'version', 'maintainer', 'maintainer_email', 'license', 'description')
+METADATA_PATTERN = re.compile(r'\b(%s)\s+[\'"]([^\'"]+)[\'"]' % '|'.join(METADATA_ATTRIBUTES))
+# Matched directly against the memory-mapped bytes of metadata.rb
+NAME_PATTERN = re.compile(rb'name\s+[\'"]([^\'"]+)[\'"]')
+
+# Dependency declarations: depends 'name'[, 'version']
+DEPENDS_PATTERN = re.compile(r'depends\s+[\'"]([^\'"]+)[\'"](?:\s*,\s*[\'"]([^\'"]+)[\'"])?')
+
+# Property lines inside a resource block
+PROPERTY_PATTERN = re.compile(r'(\w+)\s+(.+?)(?=\n\s+\w+\s+|\Z)', re.DOTALL)
+
+def _scan_files(directory, suffix):
+    """
+    Yield the files with a given suffix directly inside a directory
+    
+    Uses os.scandir so the file type comes from the cached directory entry
+    instead of a separate stat() per path.
+    
+    Args:
+        directory (Path): Directory to scan
+        suffix (str): File name suffix to match, e.g. '.rb'
+        
+    Yields:
+        Path: Path of each matching file
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith(suffix) and entry.is_file():
+                yield Path(entry.path)
+
+def _walk_files(directory):
+    """
+    Yield every file below a directory, recursively
+    
+    Args:
+        directory (Path): Directory to walk
+        
+    Yields:
+        Path: Path of each file
+    """
+    for root, _, file_names in os.walk(directory):
+        for file_name in file_names:
+            yield Path(root, file_name)
+
+def _trie_pattern(words):
+    """
+    Build a regex alternation of words factored into a character trie
+    
+    For example ('apt_update', 'apt_repository', 'bash') becomes
+    'apt_(?:repository|update)|bash', so the engine branches on shared
+    prefixes once instead of retrying every alternative from the start.
+    
+    Args:
+        words (iterable): Literal words to match
+        
+    Returns:
+        str: Regex source matching any of the words
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        # An empty key marks the end of a word
+        node[''] = {}
+    
+    def emit(node):
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if '' not in node and len(branches) == 1:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if '' in node else group
+    
+    # The caller wraps the result in its own group, so the top level is a bare alternation
+    return '|'.join(re.escape(char) + emit(child) for char, child in sorted(trie.items()) if char)
+
+@functools.lru_cache(maxsize=None)
+def _resource_block_pattern(resource_types):
+    """
+    Compile the regex that matches resource blocks of the given types
+    
+    Uses google-re2 when it is installed, which guarantees linear-time
+    matching on malformed recipes where backtracking would degrade.
+    
+    Args:
+        resource_types (tuple): Chef resource type names
+        
+    Returns:
+        re.Pattern: Compiled resource block pattern
+    """
+    pattern = r'(?s)(%s)\s+[\'"]([^\'"]+)[\'"]\s+do\s+(.*?)\s+end' % _trie_pattern(resource_types)
+    if re2 is not None:
+        return re2.compile(pattern)
+    return re.compile(pattern)
+
 class ChefParser:
     """Parses Chef cookbooks and recipes"""
     
@@ -24,16 +140,21 @@ class ChefParser:
         Returns:
             list: List of dictionaries containing cookbook information
         """
-        cookbooks = []
-        
         # Convert string path to Path object if needed
         if isinstance(repo_path, str):
             repo_path = Path(repo_path)
         
+        cookbooks = []
+        
         # Look for metadata.rb files which indicate a cookbook
-        for metadata_file in repo_path.glob('**/metadata.rb'):
-            cookbook_path = metadata_file.parent
-            cookbook_name = self._extract_cookbook_name(metadata_file)
+        for root, dir_names, file_names in os.walk(repo_path):
+            # Prune VCS and dependency trees, and visit the rest in a stable order
+            dir_names[:] = sorted(d for d in dir_names if d not in SKIPPED_SCAN_DIRS)
+            if 'metadata.rb' not in file_names:
+                continue
+            
+            cookbook_path = Path(root)
+            cookbook_name = self._extract_cookbook_name(cookbook_path / 'metadata.rb')
             
             cookbooks.append({
                 'name': cookbook_name,
@@ -52,13 +173,16 @@ class ChefParser:
         Returns:
             str: Cookbook name
         """
-        with open(metadata_file, 'r') as f:
-            content = f.read()
-        
-        # Look for name attribute in metadata.rb
-        name_match = re.search(r'name\s+[\'"]([^\'"]+)[\'"]', content)
-        if name_match:
-            return name_match.group(1)
+        # Look for name attribute in metadata.rb, letting the OS page in only what the search touches
+        with open(metadata_file, 'rb') as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    name_match = NAME_PATTERN.search(content)
+                    if name_match:
+                        return name_match.group(1).decode('utf-8', errors='ignore')
+            except ValueError:
+                # Empty files cannot be memory-mapped
+                pass
         
         # If name is not specified, use the directory name
         return metadata_file.parent.name
@@ -73,15 +197,26 @@ class ChefParser:
         Returns:
             dict: Parsed cookbook data
         """
+        # List the cookbook directory once so missing sections are skipped
+        # without probing each one; if listing fails, every parser checks for itself
+        try:
+            with os.scandir(cookbook_path) as entries:
+                present = {entry.name for entry in entries}
+        except OSError:
+            present = None
+        
+        def has(name):
+            return present is None or name in present
+        
         cookbook_data = {
             'name': cookbook_path.name,
-            'metadata': self._parse_metadata(cookbook_path / 'metadata.rb'),
-            'recipes': self._parse_recipes(cookbook_path / 'recipes'),
-            'attributes': self._parse_attributes(cookbook_path / 'attributes'),
-            'templates': self._find_templates(cookbook_path / 'templates'),
-            'files': self._find_files(cookbook_path / 'files'),
-            'resources': self._parse_resources(cookbook_path / 'resources'),
-            'libraries': self._parse_libraries(cookbook_path / 'libraries'),
+            'metadata': self._parse_metadata(cookbook_path / 'metadata.rb') if has('metadata.rb') else {},
+            'recipes': self._parse_recipes(cookbook_path / 'recipes') if has('recipes') else [],
+            'attributes': self._parse_attributes(cookbook_path / 'attributes') if has('attributes') else [],
+            'templates': self._find_templates(cookbook_path / 'templates') if has('templates') else [],
+            'files': self._find_files(cookbook_path / 'files') if has('files') else [],
+            'resources': self._parse_resources(cookbook_path / 'resources') if has('resources') else [],
+            'libraries': self._parse_libraries(cookbook_path / 'libraries') if has('libraries') else [],
             'data_bags': self._find_data_bags(cookbook_path.parent.parent / 'data_bags')
         }
         
@@ -100,19 +235,17 @@ class ChefParser:
         if not metadata_file.exists():
             return {}
         
-        with open(metadata_file, 'r') as f:
-            content = f.read()
+        content = metadata_file.read_text(encoding='utf-8', errors='ignore')
         
         metadata = {}
         
         # Extract common metadata attributes
-        for attr in ['name', 'version', 'maintainer', 'maintainer_email', 'license', 'description']:
-            match = re.search(rf'{attr}\s+[\'"]([^\'"]+)[\'"]', content)
-            if match:
-                metadata[attr] = match.group(1)
+        for match in METADATA_PATTERN.finditer(content):
+            # Keep the first occurrence of each attribute
+            metadata.setdefault(match.group(1), match.group(2))
         
         # Extract dependencies
-        dependencies = re.findall(r'depends\s+[\'"]([^\'"]+)[\'"](?:\s*,\s*[\'"]([^\'"]+)[\'"])?', content)
+        dependencies = DEPENDS_PATTERN.findall(content)
         metadata['dependencies'] = [{'name': dep[0], 'version': dep[1] if dep[1] else None} for dep in dependencies]
         
         return metadata
@@ -132,9 +265,8 @@ class ChefParser:
         
         recipes = []
         
-        for recipe_file in recipes_dir.glob('*.rb'):
-            with open(recipe_file, 'r') as f:
-                content = f.read()
+        for recipe_file in _scan_files(recipes_dir, '.rb'):
+            content = recipe_file.read_text(encoding='utf-8', errors='ignore')
             
             recipe_name = recipe_file.stem
             
@@ -159,25 +291,15 @@ class ChefParser:
         """
         resources = []
         
-        # Common Chef resource types
-        resource_types = [
-            'package', 'service', 'template', 'cookbook_file', 'file', 'directory',
-            'execute', 'bash', 'ruby_block', 'cron', 'user', 'group', 'mount',
-            'remote_file', 'git', 'apt_repository', 'yum_repository', 'apt_update'
-        ]
-        
-        # Pattern to match resource blocks
-        resource_pattern = r'(%s)\s+[\'"]([^\'"]+)[\'"]\s+do\s+(.*?)\s+end' % '|'.join(resource_types)
-        
         # Find all resource blocks using regex
-        for match in re.finditer(resource_pattern, content, re.DOTALL):
+        for match in _resource_block_pattern(RESOURCE_TYPES).finditer(content):
             resource_type = match.group(1)
             resource_name = match.group(2)
             resource_content = match.group(3)
             
             # Extract properties from the resource block
             properties = {}
-            for prop_match in re.finditer(r'(\w+)\s+(.+?)(?=\n\s+\w+\s+|\Z)', resource_content, re.DOTALL):
+            for prop_match in PROPERTY_PATTERN.finditer(resource_content):
                 prop_name = prop_match.group(1)
                 prop_value = prop_match.group(2).strip()
                 properties[prop_name] = prop_value
@@ -206,9 +328,8 @@ class ChefParser:
         
         attributes = []
         
-        for attr_file in attributes_dir.glob('*.rb'):
-            with open(attr_file, 'r') as f:
-                content = f.read()
+        for attr_file in _scan_files(attributes_dir, '.rb'):
+            content = attr_file.read_text(encoding='utf-8', errors='ignore')
             
             attributes.append({
                 'name': attr_file.stem,
@@ -233,19 +354,14 @@ class ChefParser:
         
         templates = []
         
-        for template_file in templates_dir.glob('**/*'):
-            if template_file.is_file():
-                with open(template_file, 'r', errors='ignore') as f:
-                    try:
-                        content = f.read()
-                    except UnicodeDecodeError:
-                        content = None
-                
-                templates.append({
-                    'name': template_file.name,
-                    'path': str(template_file.relative_to(templates_dir)),
-                    'content': content
-                })
+        for template_file in _walk_files(templates_dir):
+            content = template_file.read_text(encoding='utf-8', errors='ignore')
+            
+            templates.append({
+                'name': template_file.name,
+                'path': str(template_file.relative_to(templates_dir)),
+                'content': content
+            })
         
         return templates
     
@@ -264,12 +380,11 @@ class ChefParser:
         
         files = []
         
-        for file_path in files_dir.glob('**/*'):
-            if file_path.is_file():
-                files.append({
-                    'name': file_path.name,
-                    'path': str(file_path.relative_to(files_dir))
-                })
+        for file_path in _walk_files(files_dir):
+            files.append({
+                'name': file_path.name,
+                'path': str(file_path.relative_to(files_dir))
+            })
         
         return files
     
@@ -288,9 +403,8 @@ class ChefParser:
         
         resources = []
         
-        for resource_file in resources_dir.glob('*.rb'):
-            with open(resource_file, 'r') as f:
-                content = f.read()
+        for resource_file in _scan_files(resources_dir, '.rb'):
+            content = resource_file.read_text(encoding='utf-8', errors='ignore')
             
             resources.append({
                 'name': resource_file.stem,
@@ -315,9 +429,8 @@ class ChefParser:
         
         libraries = []
         
-        for library_file in libraries_dir.glob('*.rb'):
-            with open(library_file, 'r') as f:
-                content = f.read()
+        for library_file in _scan_files(libraries_dir, '.rb'):
+            content = library_file.read_text(encoding='utf-8', errors='ignore')
             
             libraries.append({
                 'name': library_file.stem,
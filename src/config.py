@@ -8,6 +8,15 @@ import logging
 class Config:
     """Configuration class for the Chef to Ansible converter"""
     
+    # Log level names accepted in CHEF_TO_ANSIBLE_LOG_LEVEL
+    LOG_LEVELS = {
+        'DEBUG': logging.DEBUG,
+        'INFO': logging.INFO,
+        'WARNING': logging.WARNING,
+        'ERROR': logging.ERROR,
+        'CRITICAL': logging.CRITICAL
+    }
+    
     def __init__(self, api_key=None, model=None, verbose=False, log_level=None, log_file=None):
         """Initialize the configuration with the given parameters"""
         # API settings
@@ -21,15 +30,34 @@ class Config:
         
         # Default conversion settings
         self.max_tokens = int(os.environ.get('CHEF_TO_ANSIBLE_MAX_TOKENS', '4096'))
+        self.max_input_tokens = int(os.environ.get('CHEF_TO_ANSIBLE_MAX_INPUT_TOKENS', '200000'))  # model context window
         self.temperature = float(os.environ.get('CHEF_TO_ANSIBLE_TEMPERATURE', '0.2'))
         self.examples_per_request = int(os.environ.get('CHEF_TO_ANSIBLE_EXAMPLES', '3'))
+        self.max_concurrency = int(os.environ.get('CHEF_TO_ANSIBLE_MAX_CONCURRENCY', '4'))
+        
+        # Message Batches API settings (cheaper, but results can take minutes to arrive)
+        self.use_batch_api = os.environ.get('CHEF_TO_ANSIBLE_BATCH', 'false').lower() in ('1', 'true', 'yes')
+        self.batch_poll_interval = int(os.environ.get('CHEF_TO_ANSIBLE_BATCH_POLL_INTERVAL', '10'))  # seconds
+        self.batch_max_wait = int(os.environ.get('CHEF_TO_ANSIBLE_BATCH_MAX_WAIT', '3600'))  # seconds
+        
+        # Convert recipes made only of simple package, service and directory resources without the LLM
+        self.use_rule_based = os.environ.get('CHEF_TO_ANSIBLE_RULE_BASED', 'false').lower() in ('1', 'true', 'yes')
         
         # Paths for temporary files
         self.temp_dir = os.environ.get('CHEF_TO_ANSIBLE_TEMP_DIR', 'temp')
         
+        # Response cache settings
+        self.use_cache = os.environ.get('CHEF_TO_ANSIBLE_CACHE', 'true').lower() not in ('0', 'false', 'no')
+        self.cache_dir = os.environ.get('CHEF_TO_ANSIBLE_CACHE_DIR',
+                                        os.path.join(os.path.expanduser('~'), '.cache', 'chef_to_ansible'))
+        self.cache_ttl_days = int(os.environ.get('CHEF_TO_ANSIBLE_CACHE_TTL_DAYS', '30'))
+        
         # Timeout settings
         self.api_timeout = int(os.environ.get('CHEF_TO_ANSIBLE_API_TIMEOUT', '120'))  # seconds
         
+        # Retry settings for rate limited, overloaded or unreachable API calls
+        self.max_retries = int(os.environ.get('CHEF_TO_ANSIBLE_MAX_RETRIES', '4'))
+        
         # Custom resource mapping settings
         self.resource_mapping_path = os.environ.get('CHEF_TO_ANSIBLE_RESOURCE_MAPPING', 
                                                   os.path.join(os.path.dirname(os.path.dirname(__file__)), 
@@ -41,11 +69,4 @@ class Config:
             return log_level
             
         env_level = os.environ.get('CHEF_TO_ANSIBLE_LOG_LEVEL', 'INFO').upper()
-        level_map = {
-            'DEBUG': logging.DEBUG,
-            'INFO': logging.INFO,
-            'WARNING': logging.WARNING,
-            'ERROR': logging.ERROR,
-            'CRITICAL': logging.CRITICAL
-        }
-        return level_map.get(env_level, logging.INFO)
+        return self.LOG_LEVELS.get(env_level, logging.INFO)
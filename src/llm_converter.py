@@ -3,17 +3,352 @@ LLM converter module for the Chef to Ansible converter
 """
 
 import os
+import copy
 import json
+import logging
 import re
 import sys
+import time
+import random
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 import anthropic
 import yaml
-from ruamel.yaml import YAML
 
+from src.api_client import get_client
+from src.chef_parser import RESOURCE_TYPES
 from src.logger import logger
 from src.resource_mapping import ResourceMapping
+from src.response_cache import ResponseCache
+
+# Claude model used for all conversion requests
+API_MODEL = "claude-3-7-sonnet-20250219"
+
+# Use the libyaml C parser when it is available
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Layout of one few-shot example in the prompt; examples are separated by '---'
+EXAMPLE_TEMPLATE = "CHEF CODE:\n```ruby\n{chef_code}\n```\nANSIBLE CODE:\n```yaml\n{ansible_code}\n```\n"
+
+# Handlers section of the requested response format, left out for recipes without notifications
+HANDLERS_OUTPUT_FORMAT = "# Handlers\n```yaml\n# Your handlers here\n```\n\n"
+
+# Chef properties that make a recipe need handlers
+NOTIFICATION_KEYWORDS = ('notifies', 'subscribes')
+
+# API errors worth retrying: rate limits, overloaded or failing servers and network problems.
+# Newer SDKs raise dedicated classes for 503, 504 and 529 responses that are not InternalServerErrors
+RETRYABLE_API_ERRORS = tuple(
+    getattr(anthropic, name)
+    for name in ('RateLimitError', 'InternalServerError', 'OverloadedError', 'ServiceUnavailableError',
+                 'DeadlineExceededError', 'APIConnectionError')
+    if hasattr(anthropic, name)
+)
+
+# Longest wait between API retries, in seconds
+MAX_RETRY_DELAY = 60
+
+# Conservative characters-per-token estimate for Ruby and prompt text
+CHARS_PER_TOKEN = 3
+
+# Top-level Chef resource declarations where an oversized recipe can be split
+RESOURCE_BOUNDARY_PATTERN = re.compile(r'^(?=(?:%s)\b)' % '|'.join(RESOURCE_TYPES), re.MULTILINE)
+
+# Simple resources converted without the LLM: a literal name and at most an action property
+RULE_BASED_RESOURCE_PATTERN = re.compile(
+    r"""^(package|service|directory)\s+(['"])([\w./+-]+)\2"""
+    r"""(?:\s+do\s*\n\s*action\s+(:\w+|\[\s*:\w+(?:\s*,\s*:\w+)*\s*\])\s*\nend)?\s*$""",
+    re.MULTILINE
+)
+RULE_BASED_ACTION_PATTERN = re.compile(r':(\w+)')
+
+# Ansible module, name parameter and default Chef action for each rule based resource
+RULE_BASED_MODULES = {
+    'package': ('ansible.builtin.package', 'name', 'install'),
+    'service': ('ansible.builtin.service', 'name', None),
+    'directory': ('ansible.builtin.file', 'path', 'create'),
+}
+
+# Ansible module parameters for the Chef actions of rule based resources
+RULE_BASED_ACTIONS = {
+    'package': {
+        'install': {'state': 'present'},
+        'upgrade': {'state': 'latest'},
+        'remove': {'state': 'absent'},
+        'purge': {'state': 'absent'},
+    },
+    'service': {
+        'start': {'state': 'started'},
+        'stop': {'state': 'stopped'},
+        'restart': {'state': 'restarted'},
+        'reload': {'state': 'reloaded'},
+        'enable': {'enabled': True},
+        'disable': {'enabled': False},
+    },
+    'directory': {
+        'create': {'state': 'directory'},
+        'delete': {'state': 'absent'},
+    },
+}
+
+# Start of a Ruby heredoc, capturing its terminator
+HEREDOC_START_PATTERN = re.compile(r"<<[-~]?(['\"]?)([A-Za-z_]\w*)\1")
+
+# Start of a Ruby percent literal such as %q{...} or %w(...), capturing its delimiter
+PERCENT_LITERAL_PATTERN = re.compile(r"%[qQwWiIrsx]?([^\w\s=])")
+
+# Closing delimiters of bracketed percent literals, which nest
+LITERAL_CLOSERS = {'(': ')', '[': ']', '{': '}', '<': '>'}
+
+# Number of streamed text chunks between progress updates
+STREAM_PROGRESS_INTERVAL = 16
+
+# Opening fences of YAML blocks in an LLM response, and the fence that closes any block
+YAML_FENCE_OPENERS = ("```yaml", "```yml")
+CODE_FENCE = "```"
+
+# Matches each fenced block in an LLM response with its language and, when the
+# block directly follows a '# Tasks', '# Handlers' or '# Variables' header, that label
+RESPONSE_BLOCK_PATTERN = re.compile(
+    r"(?:#\s*(tasks|handlers|variables)[^\n]*\n\s*)?```([a-z]*)\s*(.*?)```",
+    re.DOTALL | re.IGNORECASE
+)
+
+# Fence languages that hold YAML; a labelled section may also leave the language out
+YAML_FENCE_LANGUAGES = frozenset(('yaml', 'yml'))
+SECTION_FENCE_LANGUAGES = YAML_FENCE_LANGUAGES | {''}
+
+# Jinja delimiters already present in ERB content, and their escaped forms
+JINJA_DELIMITER_ESCAPES = {'{{': r'\{\{', '}}': r'\}\}'}
+JINJA_DELIMITER_PATTERN = re.compile(r'\{\{|\}\}')
+
+# ERB tags; the first group marks <%= output tags and the second is the tag body
+ERB_TAG_PATTERN = re.compile(r'<%(=?)\s*(.+?)\s*%>')
+
+# ERB control flow tag bodies that have a direct Jinja2 equivalent
+ERB_IF_BODY = re.compile(r'if\s+(.+)')
+ERB_ELSIF_BODY = re.compile(r'elsif\s+(.+)')
+ERB_EACH_BODY = re.compile(r'(.+?)\.each\s+do\s*\|\s*(.+?)\s*\|')
+
+# Other Ruby block openers that a later <% end %> closes
+ERB_LOOP_OPENER = re.compile(r'(?:while|until)\b.*|.*\bdo(?:\s*\|[^|]*\|)?')
+ERB_CONDITIONAL_OPENER = re.compile(r'(?:if|unless|case)\b.*')
+
+# Chef node attribute lookup chains of any depth and the pattern for each key in the chain
+NODE_ATTR_CHAINS = (
+    (re.compile(r"node((?:\['[^']+'\])+)"), re.compile(r"\['([^']+)'\]")),
+    (re.compile(r"node((?:\[:[^\]]+\])+)"), re.compile(r"\[:([^\]]+)\]")),
+)
+NODE_DOT_ATTR_PATTERN = re.compile(r"node\.([a-zA-Z0-9_]+)")
+
+# Common node attributes and the Ansible facts that replace them
+NODE_FACTS = {
+    'hostname': 'ansible_hostname',
+    'ipaddress': 'ansible_default_ipv4.address',
+    'platform_version': 'ansible_distribution_version',
+    'platform': 'ansible_distribution',
+}
+NODE_FACTS_PATTERN = re.compile('|'.join(NODE_FACTS))
+
+# Chef helpers and Ruby string interpolation
+FILE_EXIST_PATTERN = re.compile(r"File\.exist\?\(['\"](.*?)['\"]\)")
+RUBY_INTERPOLATION_PATTERN = re.compile(r'"([^"]*?)#\{(.+?)\}([^"]*?)"')
+
+
+# Chef to Ansible conversion examples used for few-shot prompting
+# These examples follow Ansible best practices:
+# 1. Use Fully Qualified Collection Names (FQCN) for modules
+# 2. Use proper capitalization for handler names
+# 3. Use 'true' and 'false' instead of 'yes' and 'no'
+CONVERSION_EXAMPLES = (
+    {
+        "chef_code": "\npackage 'nginx' do\n  action :install\nend\n            ",
+        "ansible_code": "\n- name: Install nginx\n  ansible.builtin.package:\n    name: nginx\n    state: present\n            "
+    },
+    {
+        "chef_code": "\ntemplate '/etc/nginx/nginx.conf' do\n  source 'nginx.conf.erb'\n  variables(\n    server_name: node['nginx']['server_name']\n  )\n  notifies :reload, 'service[nginx]'\nend\n            ",
+        "ansible_code": "\n- name: Configure nginx\n  ansible.builtin.template:\n    src: nginx.conf.j2\n    dest: /etc/nginx/nginx.conf\n  vars:\n    server_name: \"{{ nginx_server_name }}\"\n  notify: Reload nginx\n\n# In handlers section:\n- name: Reload nginx\n  ansible.builtin.service:\n    name: nginx\n    state: reloaded\n            "
+    },
+    {
+        "chef_code": "\nif platform_family?('debian')\n  package 'apt-transport-https'\nend\n            ",
+        "ansible_code": "\n- name: Install apt-transport-https\n  ansible.builtin.package:\n    name: apt-transport-https\n    state: present\n  when: ansible_facts['os_family'] == 'Debian'\n            "
+    },
+    {
+        "chef_code": "\nservice 'nginx' do\n  action [:enable, :start]\nend\n            ",
+        "ansible_code": "\n- name: Enable and start nginx service\n  ansible.builtin.service:\n    name: nginx\n    state: started\n    enabled: true\n            "
+    },
+    {
+        "chef_code": "\ndirectory '/var/www/html' do\n  owner 'www-data'\n  group 'www-data'\n  mode '0755'\n  recursive true\n  action :create\nend\n            ",
+        "ansible_code": "\n- name: Create web directory\n  ansible.builtin.file:\n    path: /var/www/html\n    state: directory\n    owner: www-data\n    group: www-data\n    mode: '0755'\n    recurse: true\n            "
+    }
+)
+
+
+def _scan_string_literals(line, literal=None):
+    """
+    Track which string literal, if any, is still open at the end of a line
+    
+    Args:
+        line (str): Line of Ruby source
+        literal (tuple, optional): Literal open at the start of the line, as
+            (opening delimiter, closing delimiter, nesting depth)
+        
+    Returns:
+        tuple: Literal open at the end of the line, or None
+    """
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if literal:
+            opener, closer, depth = literal
+            if char == '\\':
+                i += 2
+                continue
+            if char == closer:
+                literal = (opener, closer, depth - 1) if depth > 1 else None
+            elif char == opener:
+                literal = (opener, closer, depth + 1)
+        elif char == '#':
+            # The rest of the line is a comment
+            break
+        elif char in '\'"`':
+            literal = (char, char, 1)
+        elif char == '%':
+            percent = PERCENT_LITERAL_PATTERN.match(line, i)
+            if percent:
+                opener = percent.group(1)
+                literal = (opener, LITERAL_CLOSERS.get(opener, opener), 1)
+                i = percent.end()
+                continue
+        i += 1
+    return literal
+
+
+def _normalize_recipe(content):
+    """
+    Reduce recipe source to the lines that affect its conversion
+    
+    Drops blank lines, full-line comments and trailing whitespace, so recipes
+    that differ only in formatting or commentary normalize to the same text.
+    Heredoc bodies and lines inside multi-line string or percent literals are
+    kept verbatim because they are file or script content rather than Ruby code.
+    
+    Args:
+        content (str): Recipe source
+        
+    Returns:
+        str: Normalized recipe source
+    """
+    normalized = []
+    heredoc_terminator = None
+    literal = None
+    for line in content.splitlines():
+        if heredoc_terminator:
+            normalized.append(line)
+            if line.strip() == heredoc_terminator:
+                heredoc_terminator = None
+            continue
+        
+        if literal:
+            normalized.append(line)
+            literal = _scan_string_literals(line, literal)
+            continue
+        
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        
+        literal = _scan_string_literals(line)
+        # Trailing whitespace of a line that ends inside a literal is content
+        normalized.append(line if literal else line.rstrip())
+        
+        heredoc = HEREDOC_START_PATTERN.search(line)
+        if heredoc and not literal:
+            heredoc_terminator = heredoc.group(2)
+    return "\n".join(normalized)
+
+
+def _make_erb_tag_replacer():
+    """
+    Create a substitution function that converts ERB tags to Jinja2 in one pass
+    
+    The function keeps a stack of open blocks, so each <% end %> becomes the
+    endfor or endif that matches the block it closes.
+    
+    Returns:
+        callable: Replacement function for ERB_TAG_PATTERN matches
+    """
+    open_blocks = []
+    
+    def replace(match):
+        is_output, body = match.groups()
+        if is_output:
+            return "{{ " + body + " }}"
+        
+        if body == 'end':
+            if open_blocks and open_blocks.pop() == 'for':
+                return '{% endfor %}'
+            return '{% endif %}'
+        if body == 'else':
+            return '{% else %}'
+        
+        condition = ERB_ELSIF_BODY.fullmatch(body)
+        if condition:
+            return "{% elif " + condition.group(1) + " %}"
+        
+        condition = ERB_IF_BODY.fullmatch(body)
+        if condition:
+            open_blocks.append('if')
+            return "{% if " + condition.group(1) + " %}"
+        
+        loop = ERB_EACH_BODY.fullmatch(body)
+        if loop:
+            open_blocks.append('for')
+            return "{% for " + loop.group(2) + " in " + loop.group(1) + " %}"
+        
+        # Keep any other tag as a Jinja2 statement, tracking the blocks it opens
+        if ERB_CONDITIONAL_OPENER.fullmatch(body):
+            open_blocks.append('if')
+        elif ERB_LOOP_OPENER.fullmatch(body):
+            open_blocks.append('for')
+        return "{% " + body + " %}"
+    
+    return replace
+
+
+@functools.lru_cache(maxsize=None)
+def _code_block_pattern(block_name):
+    """
+    Compile the regex that matches a fenced YAML block, optionally labelled with a name
+    
+    Args:
+        block_name (str): Name of the block, e.g. 'tasks.yml'
+        
+    Returns:
+        re.Pattern: Compiled code block pattern
+    """
+    return re.compile(rf"(?:```yaml|```yml)\s*(?:#\s*{block_name})?\s*(.*?)```", re.DOTALL)
+
+
+@functools.lru_cache(maxsize=None)
+def _section_patterns(section_name):
+    """
+    Compile the regexes that match a response section such as '# Tasks'
+    
+    Args:
+        section_name (str): Name of the section
+        
+    Returns:
+        tuple: Pattern for a fenced section and pattern for a bare YAML list section
+    """
+    return (
+        re.compile(rf"#\s*{section_name}[^\n]*\n\s*```(?:yaml|yml)?\s*(.*?)```", re.DOTALL | re.IGNORECASE),
+        re.compile(rf"#\s*{section_name}[^\n]*\n((?:[ \t]*-.*\n)+)", re.DOTALL | re.IGNORECASE)
+    )
+
 
 class LLMConverter:
     """Converts Chef code to Ansible using Anthropic's Claude API"""
@@ -27,18 +362,35 @@ class LLMConverter:
             progress_callback (callable): Optional callback function for progress updates
         """
         self.config = config
-        self.client = anthropic.Anthropic(api_key=config.api_key)
-        self.progress_callback = progress_callback
+        # Retries are handled by _with_retries so they can be reported through progress updates
+        self.client = get_client(config.api_key, max_retries=0)
+        # Recipes are converted on several threads, so deliver progress updates one at a time
+        self.progress_callback = self._serialize_callback(progress_callback) if progress_callback else None
+        
+        # Caps live API calls across every thread using this converter, including
+        # cookbooks converted in parallel that each convert their recipes in parallel
+        self._api_slots = threading.BoundedSemaphore(max(1, int(getattr(config, 'max_concurrency', 1))))
         
         # Load conversion examples
         self.examples = self._load_examples()
         
+        # The instructions and examples are identical for every recipe, so build them once
+        self._cached_prefix = self._build_static_prefix()
+        
+        # Size of the prompt without the recipe path, code and feedback, for the context window check
+        self._prompt_overhead_tokens = self._estimate_tokens(self._build_conversion_prompt({'path': '', 'content': ''}))
+        
         # Load custom resource mappings
         self.custom_mappings = self._load_custom_mappings()
         
         # Initialize resource mapping
         custom_mapping_path = getattr(config, 'resource_mapping_path', None)
         self.resource_mapper = ResourceMapping(custom_mapping_path)
+        
+        # Initialize the on-disk response cache
+        self.cache = None
+        if getattr(config, 'use_cache', False):
+            self.cache = ResponseCache(config.cache_dir, config.cache_ttl_days)
     
     def _load_custom_mappings(self):
         """Loads custom resource mappings from the JSON file specified in the config."""
@@ -56,35 +408,32 @@ class LLMConverter:
         """
         Load Chef to Ansible conversion examples
         
+        The examples are immutable, so every converter shares the module-level tuple.
+        
         Returns:
-            list: List of conversion examples
+            tuple: Conversion examples
         """
-        # These examples follow Ansible best practices:
-        # 1. Use Fully Qualified Collection Names (FQCN) for modules
-        # 2. Use proper capitalization for handler names
-        # 3. Use 'true' and 'false' instead of 'yes' and 'no'
-        return [
-            {
-                "chef_code": "\npackage 'nginx' do\n  action :install\nend\n            ",
-                "ansible_code": "\n- name: Install nginx\n  ansible.builtin.package:\n    name: nginx\n    state: present\n            "
-            },
-            {
-                "chef_code": "\ntemplate '/etc/nginx/nginx.conf' do\n  source 'nginx.conf.erb'\n  variables(\n    server_name: node['nginx']['server_name']\n  )\n  notifies :reload, 'service[nginx]'\nend\n            ",
-                "ansible_code": "\n- name: Configure nginx\n  ansible.builtin.template:\n    src: nginx.conf.j2\n    dest: /etc/nginx/nginx.conf\n  vars:\n    server_name: \"{{ nginx_server_name }}\"\n  notify: Reload nginx\n\n# In handlers section:\n- name: Reload nginx\n  ansible.builtin.service:\n    name: nginx\n    state: reloaded\n            "
-            },
-            {
-                "chef_code": "\nif platform_family?('debian')\n  package 'apt-transport-https'\nend\n            ",
-                "ansible_code": "\n- name: Install apt-transport-https\n  ansible.builtin.package:\n    name: apt-transport-https\n    state: present\n  when: ansible_facts['os_family'] == 'Debian'\n            "
-            },
-            {
-                "chef_code": "\nservice 'nginx' do\n  action [:enable, :start]\nend\n            ",
-                "ansible_code": "\n- name: Enable and start nginx service\n  ansible.builtin.service:\n    name: nginx\n    state: started\n    enabled: true\n            "
-            },
-            {
-                "chef_code": "\ndirectory '/var/www/html' do\n  owner 'www-data'\n  group 'www-data'\n  mode '0755'\n  recursive true\n  action :create\nend\n            ",
-                "ansible_code": "\n- name: Create web directory\n  ansible.builtin.file:\n    path: /var/www/html\n    state: directory\n    owner: www-data\n    group: www-data\n    mode: '0755'\n    recurse: true\n            "
-            }
-]
+        return CONVERSION_EXAMPLES
+    
+    @staticmethod
+    def _serialize_callback(callback):
+        """
+        Wrap a progress callback so concurrent threads never call it at the same time
+        
+        Args:
+            callback (callable): Progress callback
+            
+        Returns:
+            callable: Thread-safe callback
+        """
+        lock = threading.Lock()
+        
+        def serialized(update):
+            with lock:
+                callback(update)
+        
+        return serialized
+    
     def convert_cookbook(self, cookbook, feedback=None):
         """
         Convert a Chef cookbook to Ansible
@@ -111,18 +460,71 @@ class LLMConverter:
                 'progress': 0
             })
         
-        # Convert each recipe
-        total_recipes = len(cookbook['recipes'])
-        for i, recipe in enumerate(cookbook['recipes']):
-            # Send progress update
-            if self.progress_callback:
-                self.progress_callback({
-                    'status': 'processing',
-                    'message': f"Converting recipe {i+1}/{total_recipes}: {recipe.get('name', 'Unknown')}",
-                    'progress': (i / total_recipes) * 100
-                })
+        # Convert each distinct recipe body once, even if several recipes share it
+        unique_recipes = {}
+        for recipe in cookbook['recipes']:
+            unique_recipes.setdefault(recipe.get('content'), recipe)
+        recipes = list(unique_recipes.values())
+        
+        if getattr(self.config, 'use_batch_api', False) and len(recipes) > 1:
+            # Submit every recipe in one batch instead of one live call each. Recipes
+            # converted by rule need no request, and oversized ones are split into
+            # chunks that are converted live while the batch runs. Feedback is only acted
+            # on by the LLM, so rule-based conversion is skipped on feedback runs
+            use_rule_based = feedback is None and getattr(self.config, 'use_rule_based', False)
+            plans = []
+            for recipe in recipes:
+                chunks = self._split_oversized_recipe(recipe, feedback)
+                rule_result = None
+                if len(chunks) == 1 and use_rule_based:
+                    rule_result = self._try_rule_based_convert(recipe)
+                plans.append((chunks, rule_result))
+            
+            batched = [
+                recipe for recipe, (chunks, rule_result) in zip(recipes, plans)
+                if len(chunks) == 1 and rule_result is None
+            ]
+            has_handlers = [self._recipe_has_notifications(recipe) for recipe in batched]
+            prompts = [
+                self._build_conversion_prompt(recipe, feedback, include_handlers=handlers)
+                for recipe, handlers in zip(batched, has_handlers)
+            ]
+            live_chunks = []
+            for recipe, (chunks, _) in zip(recipes, plans):
+                if len(chunks) > 1:
+                    self._report_split(recipe, chunks)
+                    live_chunks.extend(chunks)
+            
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                live_future = executor.submit(self._convert_recipes_concurrently, live_chunks, feedback) if live_chunks else None
+                batch_results = iter([
+                    self._extract_ansible_code(response, has_handlers=handlers)
+                    for response, handlers in zip(self._submit_batch(prompts), has_handlers)
+                ])
+                live_results = iter(live_future.result() if live_future else [])
             
-            conversion_result = self.convert_recipe(recipe, feedback)
+            conversion_results = []
+            for chunks, rule_result in plans:
+                if len(chunks) > 1:
+                    conversion_results.append(self._merge_chunk_results([next(live_results) for _ in chunks]))
+                elif rule_result is not None:
+                    conversion_results.append(rule_result)
+                else:
+                    conversion_results.append(next(batch_results))
+        else:
+            conversion_results = self._convert_recipes_concurrently(recipes, feedback)
+        
+        results_by_content = dict(zip(unique_recipes, conversion_results))
+        merged_contents = set()
+        
+        # Merge in recipe order so later recipes still take precedence for variables
+        for recipe in cookbook['recipes']:
+            content = recipe.get('content')
+            conversion_result = results_by_content[content]
+            if content in merged_contents:
+                # Repeated tasks must be separate objects or the YAML dumper emits aliases
+                conversion_result = copy.deepcopy(conversion_result)
+            merged_contents.add(content)
             
             # Add tasks and handlers from this recipe
             result['tasks'].extend(conversion_result.get('tasks', []))
@@ -142,6 +544,45 @@ class LLMConverter:
         
         return result
     
+    def _convert_recipes_concurrently(self, recipes, feedback=None):
+        """
+        Convert recipes in parallel with live API calls
+        
+        Args:
+            recipes (list): Parsed recipes
+            feedback (str): Feedback from previous conversion attempt
+            
+        Returns:
+            list: Conversion results in the same order as the recipes
+        """
+        total_recipes = len(recipes)
+        conversion_results = [None] * total_recipes
+        max_workers = max(1, min(getattr(self.config, 'max_concurrency', 1), total_recipes))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.convert_recipe, recipe, feedback): i
+                for i, recipe in enumerate(recipes)
+            }
+            try:
+                for completed, future in enumerate(as_completed(futures), 1):
+                    i = futures[future]
+                    conversion_results[i] = future.result()
+                    
+                    # Send progress update
+                    if self.progress_callback:
+                        self.progress_callback({
+                            'status': 'processing',
+                            'message': f"Converted recipe {completed}/{total_recipes}: {recipes[i].get('name', 'Unknown')}",
+                            'progress': (completed / total_recipes) * 100
+                        })
+            except Exception:
+                # Don't spend API calls on recipes whose result will be discarded
+                for future in futures:
+                    future.cancel()
+                raise
+        
+        return conversion_results
+    
     def convert_recipe(self, recipe, feedback=None):
         """
         Convert a Chef recipe to Ansible tasks
@@ -153,32 +594,253 @@ class LLMConverter:
         Returns:
             dict: Converted Ansible tasks and handlers
         """
+        # Convert recipes too large for the model's context window piece by piece
+        chunks = self._split_oversized_recipe(recipe, feedback)
+        if len(chunks) > 1:
+            return self._convert_recipe_chunks(recipe, chunks, feedback)
+        
+        # Convert recipes made only of simple resources without calling the API,
+        # unless there is feedback on an earlier conversion for the LLM to act on
+        if feedback is None and getattr(self.config, 'use_rule_based', False):
+            result = self._try_rule_based_convert(recipe)
+            if result is not None:
+                logger.debug(f"Converted recipe without the LLM: {recipe.get('name', 'Unknown')}")
+                return result
+        
+        # Recipes that never notify or subscribe cannot produce handlers
+        has_handlers = self._recipe_has_notifications(recipe)
+        
+        # Reuse the conversion of an earlier recipe that differs only in comments or whitespace
+        cache_key = None
+        if self.cache:
+            cache_key = ResponseCache.make_key(
+                'recipe',
+                API_MODEL,
+                self.config.temperature,
+                self.config.max_tokens,
+                self._cached_prefix,
+                self.custom_mappings,
+                _normalize_recipe(recipe.get('content') or ''),
+                feedback,
+                has_handlers
+            )
+            cached_result = self.cache.get(cache_key)
+            if cached_result is not None:
+                logger.debug(f"Using cached conversion for recipe: {recipe.get('name', 'Unknown')}")
+                return cached_result
+        
         # Build the prompt for the LLM
-        prompt = self._build_conversion_prompt(recipe, feedback)
+        prompt = self._build_conversion_prompt(recipe, feedback, include_handlers=has_handlers)
         
         # Call the Anthropic API
-        response = self._call_anthropic_api(prompt)
+        # The conversion is cached under the recipe key, so skip the per-prompt response cache
+        response = self._call_anthropic_api(prompt, use_cache=False)
         
         # Extract Ansible tasks and handlers from the response
-        return self._extract_ansible_code(response)
+        result = self._extract_ansible_code(response, has_handlers=has_handlers)
+        
+        if cache_key:
+            self.cache.set(cache_key, result)
+        
+        return result
     
-    def _build_conversion_prompt(self, recipe, feedback=None):
+    def _try_rule_based_convert(self, recipe):
+        """
+        Convert a recipe made only of simple package, service and directory resources
+        
+        Args:
+            recipe (dict): Parsed recipe data
+            
+        Returns:
+            dict: Converted Ansible tasks and handlers, or None if the recipe needs the LLM
+        """
+        content = _normalize_recipe(recipe.get('content') or '')
+        matches = list(RULE_BASED_RESOURCE_PATTERN.finditer(content))
+        if not matches or RULE_BASED_RESOURCE_PATTERN.sub('', content).strip():
+            return None
+        
+        tasks = []
+        for match in matches:
+            resource_type, _, name, action = match.groups()
+            module, name_param, default_action = RULE_BASED_MODULES[resource_type]
+            actions = RULE_BASED_ACTION_PATTERN.findall(action) if action else [default_action]
+            if not actions or not all(a in RULE_BASED_ACTIONS[resource_type] for a in actions):
+                return None
+            
+            params = {name_param: name}
+            for a in actions:
+                action_params = RULE_BASED_ACTIONS[resource_type][a]
+                # Chef runs actions in order; bail out when two of them set the same parameter
+                if any(key in params for key in action_params):
+                    return None
+                params.update(action_params)
+            
+            tasks.append({
+                'name': f"{' and '.join(actions).capitalize()} {resource_type} {name}",
+                module: params
+            })
+        
+        return {
+            'tasks': tasks,
+            'handlers': [],
+            'variables': {}
+        }
+    
+    def _estimate_tokens(self, text):
+        """
+        Estimate the number of tokens in a piece of text without calling the API
+        
+        Args:
+            text (str): Text to measure
+            
+        Returns:
+            int: Approximate token count
+        """
+        return len(text) // CHARS_PER_TOKEN
+    
+    def _split_oversized_recipe(self, recipe, feedback=None):
+        """
+        Split a recipe whose prompt would not fit in the model's context window
+        
+        The recipe is cut at top-level resource declarations and the pieces are
+        packed into as few chunks as fit alongside the prompt and the response.
+        
+        Args:
+            recipe (dict): Parsed recipe data
+            feedback (str): Feedback from previous conversion attempt
+            
+        Returns:
+            list: The recipe itself if it fits, otherwise recipe dicts for each chunk
+        """
+        content = recipe.get('content') or ''
+        budget = self.config.max_input_tokens - self.config.max_tokens
+        overhead = (
+            self._prompt_overhead_tokens
+            + self._estimate_tokens(str(recipe.get('path', 'Unknown')))
+            + self._estimate_tokens(self._get_feedback_text(feedback))
+        )
+        if overhead + self._estimate_tokens(content) <= budget:
+            return [recipe]
+        
+        starts = [match.start() for match in RESOURCE_BOUNDARY_PATTERN.finditer(content)]
+        bounds = sorted(set([0] + starts + [len(content)]))
+        pieces = [content[start:end] for start, end in zip(bounds, bounds[1:])]
+        
+        chunks = []
+        current = ''
+        for piece in pieces:
+            if overhead + self._estimate_tokens(piece) > budget:
+                raise RuntimeError(
+                    f"Recipe {recipe.get('path', 'Unknown')} contains a resource too large to convert "
+                    f"(about {self._estimate_tokens(piece)} tokens)"
+                )
+            if current and overhead + self._estimate_tokens(current + piece) > budget:
+                chunks.append(current)
+                current = ''
+            current += piece
+        if current:
+            chunks.append(current)
+        
+        return [dict(recipe, content=chunk) for chunk in chunks]
+    
+    def _convert_recipe_chunks(self, recipe, chunks, feedback=None):
+        """
+        Convert the chunks of an oversized recipe and merge the results
+        
+        Args:
+            recipe (dict): Parsed recipe data
+            chunks (list): Recipe dicts from _split_oversized_recipe
+            feedback (str): Feedback from previous conversion attempt
+            
+        Returns:
+            dict: Converted Ansible tasks and handlers
+        """
+        self._report_split(recipe, chunks)
+        return self._merge_chunk_results([self.convert_recipe(chunk, feedback) for chunk in chunks])
+    
+    def _report_split(self, recipe, chunks):
+        """
+        Warn that a recipe is converted in several parts
+        
+        Args:
+            recipe (dict): Parsed recipe data
+            chunks (list): Recipe dicts from _split_oversized_recipe
+        """
+        message = f"Recipe {recipe.get('name', 'Unknown')} is too large for one request, converting it in {len(chunks)} parts"
+        logger.warning(message)
+        if self.progress_callback:
+            self.progress_callback({
+                'status': 'processing',
+                'message': message
+            })
+    
+    def _merge_chunk_results(self, chunk_results):
+        """
+        Merge the conversions of an oversized recipe's chunks in order
+        
+        Args:
+            chunk_results (list): Conversion results of the chunks
+            
+        Returns:
+            dict: Converted Ansible tasks and handlers
+        """
+        result = {
+            'tasks': [],
+            'handlers': [],
+            'variables': {}
+        }
+        for chunk_result in chunk_results:
+            result['tasks'].extend(chunk_result.get('tasks', []))
+            result['handlers'].extend(chunk_result.get('handlers', []))
+            result['variables'].update(chunk_result.get('variables', {}))
+        
+        return result
+    
+    def _recipe_has_notifications(self, recipe):
+        """
+        Check whether a recipe uses Chef notifications
+        
+        Args:
+            recipe (dict): Parsed recipe data
+            
+        Returns:
+            bool: True if the recipe notifies or subscribes to resources
+        """
+        content = recipe.get('content') or ''
+        return any(keyword in content for keyword in NOTIFICATION_KEYWORDS)
+    
+    def _build_conversion_prompt(self, recipe, feedback=None, include_handlers=True):
         """
         Build a prompt for the LLM to convert a Chef recipe to Ansible
         
         Args:
             recipe (dict): Parsed recipe data
             feedback (str): Feedback from previous conversion attempt
+            include_handlers (bool): Ask for a handlers section in the response
             
         Returns:
             str: Prompt for the LLM
         """
+        return self._cached_prefix + self._build_recipe_suffix(recipe, feedback, include_handlers)
+    
+    def _build_static_prefix(self):
+        """
+        Build the part of the conversion prompt that is the same for every recipe
+        
+        The prefix holds the instructions and few-shot examples, and is sent
+        with a cache_control marker so the API can reuse it across recipes.
+        
+        Returns:
+            str: Instructions and examples for the LLM
+        """
         # Include a few examples for few-shot learning
-        examples_text = ""
-        for i, example in enumerate(self.examples[:self.config.examples_per_request]):
-            examples_text += f"Example {i+1}:\n"
-            examples_text += "CHEF CODE:\n```ruby\n" + example["chef_code"].strip() + "\n```\n\n"
-            examples_text += "ANSIBLE CODE:\n```yaml\n" + example["ansible_code"].strip() + "\n```\n\n"
+        examples_text = "---\n".join(
+            EXAMPLE_TEMPLATE.format(
+                chef_code=example["chef_code"].strip(),
+                ansible_code=example["ansible_code"].strip()
+            )
+            for example in self.examples[:self.config.examples_per_request]
+        )
         
         # Build the prompt in sections for better maintainability using XML tags for structure
         intro = """
@@ -308,6 +970,31 @@ When converting Chef to Ansible, follow this step-by-step reasoning process:
 </thinking_process>
 """
 
+        # Combine all sections
+        return (
+            intro +
+            best_practices +
+            variable_handling +
+            directory_handling +
+            error_handling +
+            resource_mapping +
+            chain_of_thought +
+            "\nHERE ARE EXAMPLES:\n" + examples_text
+        )
+    
+    def _build_recipe_suffix(self, recipe, feedback=None, include_handlers=True):
+        """
+        Build the recipe-specific part of the conversion prompt
+        
+        Args:
+            recipe (dict): Parsed recipe data
+            feedback (str): Feedback from previous conversion attempt
+            include_handlers (bool): Ask for a handlers section in the response
+            
+        Returns:
+            str: Recipe code, feedback and output format instructions
+        """
+        handlers_format = HANDLERS_OUTPUT_FORMAT if include_handlers else ""
         output_format = f"""
 <input>
 Recipe Path: {recipe.get('path', 'Unknown')}
@@ -330,12 +1017,7 @@ Provide your response in the following format:
 # Your tasks here
 ```
 
-# Handlers
-```yaml
-# Your handlers here
-```
-
-# Variables
+{handlers_format}# Variables
 ```yaml
 # Variables for defaults/main.yml (user-configurable)
 # Your default variables here
@@ -346,34 +1028,53 @@ Provide your response in the following format:
 </output_format>
 """
         
-        # Combine all sections
-        prompt = (
-            intro +
-            best_practices +
-            variable_handling +
-            directory_handling +
-            error_handling +
-            resource_mapping +
-            chain_of_thought +
-            "\nHERE ARE EXAMPLES:\n" + examples_text +
-            output_format
-        )
+        return output_format
+    
+    def _message_content(self, prompt):
+        """
+        Build the user message content for a prompt
         
-        return prompt
+        Prompts that start with the shared instructions and examples are split
+        so that prefix is marked for prompt caching and only the recipe-specific
+        remainder is processed from scratch on later calls.
         
-    def _call_anthropic_api(self, prompt):
+        Args:
+            prompt (str): Prompt to send to the API
+            
+        Returns:
+            str or list: Message content for the API
+        """
+        if not prompt.startswith(self._cached_prefix):
+            return prompt
+        return [
+            {"type": "text", "text": self._cached_prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": prompt[len(self._cached_prefix):]}
+        ]
+    
+    def _call_anthropic_api(self, prompt, use_cache=True):
         """
         Call the Anthropic API to convert Chef code to Ansible
         
         Args:
             prompt (str): Prompt to send to the API
+            use_cache (bool): Look up and store the response by prompt; callers
+                that cache the converted result themselves pass False
             
         Returns:
             str: Response from the API
         """
+        # Reuse the response to an identical earlier prompt if we have one
+        cache_key = None
+        if self.cache and use_cache:
+            cache_key = self._response_cache_key(prompt)
+            cached_response = self.cache.get(cache_key)
+            if cached_response is not None:
+                logger.debug("Using cached API response")
+                return cached_response
+        
         try:
             # Use the latest Claude 3 Sonnet model
-            model = "claude-3-7-sonnet-20250219"
+            model = API_MODEL
             
             if self.config.verbose:
                 print(f"Calling Anthropic API with model: {model}...")
@@ -386,14 +1087,21 @@ Provide your response in the following format:
                     'progress': 50
                 })
                 
-            message = self.client.messages.create(
-                model=model,
-                max_tokens=self.config.max_tokens,
-                temperature=self.config.temperature,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            with self._api_slots:
+                if self.progress_callback:
+                    # Stream the response so progress keeps moving while it is generated
+                    response_text = self._with_retries(self._stream_anthropic_api, model, prompt)
+                else:
+                    message = self._with_retries(
+                        self.client.messages.create,
+                        model=model,
+                        max_tokens=self.config.max_tokens,
+                        temperature=self.config.temperature,
+                        messages=[
+                            {"role": "user", "content": self._message_content(prompt)}
+                        ]
+                    )
+                    response_text = message.content[0].text
             
             if self.config.verbose:
                 logger.debug("API call successful")
@@ -405,8 +1113,229 @@ Provide your response in the following format:
                     'message': "API call successful. Processing response...",
                     'progress': 75
                 })
+            
+            if cache_key:
+                self.cache.set(cache_key, response_text)
                 
-            return message.content[0].text
+            return response_text
+        except Exception as e:
+            logger.error(f"API Error: {str(e)}")
+            
+            # Send error update
+            if self.progress_callback:
+                self.progress_callback({
+                    'status': 'error',
+                    'message': f"API Error: {str(e)}",
+                    'progress': 0
+                })
+                
+            raise RuntimeError(f"Error calling Anthropic API: {str(e)}")
+    
+    def _with_retries(self, func, *args, **kwargs):
+        """
+        Call an Anthropic API function, retrying transient failures with exponential backoff
+        
+        Honors the Retry-After header when the API sends one and reports each
+        retry through the progress callback.
+        
+        Args:
+            func (callable): API function to call
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+            
+        Returns:
+            The function's return value
+        """
+        max_retries = getattr(self.config, 'max_retries', 0)
+        for attempt in range(max_retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except RETRYABLE_API_ERRORS as e:
+                if attempt == max_retries:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                logger.warning(f"API call failed ({str(e)}), retrying in {delay:.1f}s (attempt {attempt + 2}/{max_retries + 1})")
+                
+                # Send progress update
+                if self.progress_callback:
+                    self.progress_callback({
+                        'status': 'processing',
+                        'message': f"Anthropic API unavailable, retrying in {delay:.0f}s (attempt {attempt + 2}/{max_retries + 1})...",
+                        'progress': 50
+                    })
+                time.sleep(delay)
+    
+    def _retry_delay(self, error, attempt):
+        """
+        Work out how long to wait before retrying a failed API call
+        
+        Args:
+            error (Exception): Error raised by the API call
+            attempt (int): Zero-based number of the attempt that failed
+            
+        Returns:
+            float: Delay in seconds
+        """
+        response = getattr(error, 'response', None)
+        if response is not None:
+            try:
+                return min(MAX_RETRY_DELAY, float(response.headers.get('retry-after')))
+            except (TypeError, ValueError):
+                pass
+        return min(MAX_RETRY_DELAY, 2 ** attempt + random.random())
+    
+    def _response_cache_key(self, prompt):
+        """
+        Build the response cache key for a single API request
+        
+        Args:
+            prompt (str): Prompt sent to the API
+            
+        Returns:
+            str: Cache key
+        """
+        return ResponseCache.make_key(
+            'response',
+            API_MODEL,
+            self.config.temperature,
+            self.config.max_tokens,
+            prompt
+        )
+    
+    def _stream_anthropic_api(self, model, prompt):
+        """
+        Stream a response from the Anthropic API, sending progress updates as text arrives
+        
+        Args:
+            model (str): Model to use
+            prompt (str): Prompt to send to the API
+            
+        Returns:
+            str: Response from the API
+        """
+        chunks = []
+        received = 0
+        with self.client.messages.stream(
+            model=model,
+            max_tokens=self.config.max_tokens,
+            temperature=self.config.temperature,
+            messages=[
+                {"role": "user", "content": self._message_content(prompt)}
+            ]
+        ) as stream:
+            for text in stream.text_stream:
+                chunks.append(text)
+                received += len(text)
+                
+                # Send progress update
+                if len(chunks) % STREAM_PROGRESS_INTERVAL == 0:
+                    self.progress_callback({
+                        'status': 'processing',
+                        'message': f"Receiving response from Anthropic API ({received} characters)...",
+                        'progress': 50 + min(24, len(chunks) * 25 // self.config.max_tokens)
+                    })
+        
+        return "".join(chunks)
+    
+    def _call_anthropic_api_many(self, prompts):
+        """
+        Get responses for several independent prompts
+        
+        Uses one Message Batches API submission when batching is enabled, and
+        otherwise concurrent live calls bounded by max_concurrency.
+        
+        Args:
+            prompts (list): Prompts to send to the API
+            
+        Returns:
+            list: Response text for each prompt, in the same order as the prompts
+        """
+        if getattr(self.config, 'use_batch_api', False) and len(prompts) > 1:
+            return self._submit_batch(prompts)
+        
+        return self._call_anthropic_api_concurrently(prompts)
+    
+    def _call_anthropic_api_concurrently(self, prompts):
+        """
+        Get responses for several prompts with concurrent live calls bounded by max_concurrency
+        
+        Args:
+            prompts (list): Prompts to send to the API
+            
+        Returns:
+            list: Response text for each prompt, in the same order as the prompts
+        """
+        max_workers = max(1, min(getattr(self.config, 'max_concurrency', 1), len(prompts)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self._call_anthropic_api, prompts))
+    
+    def _submit_batch(self, prompts):
+        """
+        Convert several prompts with one Message Batches API submission
+        
+        Args:
+            prompts (list): Prompts to send to the API
+            
+        Returns:
+            list: Response text for each prompt, in the same order as the prompts
+        """
+        # Only submit prompts whose responses are not cached already
+        responses = [None] * len(prompts)
+        cache_keys = [None] * len(prompts)
+        if self.cache:
+            for i, prompt in enumerate(prompts):
+                cache_keys[i] = self._response_cache_key(prompt)
+                responses[i] = self.cache.get(cache_keys[i])
+        pending = [i for i, response in enumerate(responses) if response is None]
+        if not pending:
+            return responses
+        
+        try:
+            batch = self._with_retries(
+                self.client.messages.batches.create,
+                requests=[
+                    {
+                        "custom_id": f"r{i}",
+                        "params": {
+                            "model": API_MODEL,
+                            "max_tokens": self.config.max_tokens,
+                            "temperature": self.config.temperature,
+                            "messages": [
+                                {"role": "user", "content": self._message_content(prompts[i])}
+                            ]
+                        }
+                    }
+                    for i in pending
+                ]
+            )
+            logger.info(f"Submitted batch {batch.id} with {len(pending)} requests")
+            
+            # Send progress update
+            if self.progress_callback:
+                self.progress_callback({
+                    'status': 'processing',
+                    'message': f"Submitted {len(pending)} requests to the Message Batches API...",
+                    'progress': 25
+                })
+            
+            # Give up on a batch that stays unfinished for too long
+            deadline = time.monotonic() + self.config.batch_max_wait
+            while batch.processing_status != "ended" and time.monotonic() < deadline:
+                time.sleep(self.config.batch_poll_interval)
+                batch = self._with_retries(self.client.messages.batches.retrieve, batch.id)
+            
+            if batch.processing_status == "ended":
+                for entry in self._with_retries(self.client.messages.batches.results, batch.id):
+                    if entry.result.type != "succeeded":
+                        logger.warning(f"Batch request {entry.custom_id} {entry.result.type}")
+                        continue
+                    i = int(entry.custom_id[1:])
+                    responses[i] = entry.result.message.content[0].text
+                    if cache_keys[i]:
+                        self.cache.set(cache_keys[i], responses[i])
+            else:
+                logger.warning(f"Batch {batch.id} did not finish within {self.config.batch_max_wait}s, cancelling it")
+                self._with_retries(self.client.messages.batches.cancel, batch.id)
         except Exception as e:
             logger.error(f"API Error: {str(e)}")
             
@@ -419,6 +1348,15 @@ Provide your response in the following format:
                 })
                 
             raise RuntimeError(f"Error calling Anthropic API: {str(e)}")
+        
+        # Convert the requests that failed, expired or were cancelled with live calls
+        missing = [i for i, response in enumerate(responses) if response is None]
+        if missing:
+            logger.warning(f"Batch {batch.id} returned no result for {len(missing)} requests, converting them live")
+            for i, response in zip(missing, self._call_anthropic_api_concurrently([prompts[i] for i in missing])):
+                responses[i] = response
+        
+        return responses
     
     def _get_feedback_text(self, feedback):
         """Format feedback text for inclusion in the prompt
@@ -440,11 +1378,12 @@ YOU MUST FIX ALL ISSUES MENTIONED IN THE FEEDBACK ABOVE! Particularly:
 2. If any users don't exist, either create them or use variables that can be overridden
 3. Fix any undefined variables by adding them to defaults/main.yml"""
     
-    def _extract_ansible_code(self, response):
+    def _extract_ansible_code(self, response, has_handlers=True):
         """Extract Ansible code from the LLM response
         
         Args:
             response (str): LLM response
+            has_handlers (bool): Whether the response may contain handlers
             
         Returns:
             dict: Extracted Ansible code
@@ -456,10 +1395,26 @@ YOU MUST FIX ALL ISSUES MENTIONED IN THE FEEDBACK ABOVE! Particularly:
             'variables': {}
         }
         
-        # Look for sections labeled as tasks, handlers, and variables
-        tasks_section = self._extract_section(response, "Tasks")
-        handlers_section = self._extract_section(response, "Handlers")
-        variables_section = self._extract_section(response, "Variables")
+        # Scan the response once, collecting labelled sections and plain YAML blocks
+        sections = {}
+        yaml_blocks = []
+        for label, language, body in self._scan_response(response):
+            language = language.lower()
+            if label and language in SECTION_FENCE_LANGUAGES:
+                sections.setdefault(label.lower(), body)
+            if language in YAML_FENCE_LANGUAGES:
+                yaml_blocks.append(body)
+        
+        # Fall back to sections written as bare YAML lists under their header
+        for section_name in (('Tasks', 'Handlers') if has_handlers else ('Tasks',)):
+            if section_name.lower() not in sections:
+                match = _section_patterns(section_name)[1].search(response)
+                if match:
+                    sections[section_name.lower()] = match.group(1).strip()
+        
+        tasks_section = sections.get('tasks')
+        handlers_section = sections.get('handlers') if has_handlers else None
+        variables_section = sections.get('variables')
         
         if tasks_section:
             result['tasks'] = self._parse_yaml_content(tasks_section)
@@ -475,31 +1430,17 @@ YOU MUST FIX ALL ISSUES MENTIONED IN THE FEEDBACK ABOVE! Particularly:
                     # Remove comments from variables section
                     cleaned_variables = '\n'.join([line for line in variables_yaml.split('\n') 
                                                   if not line.strip().startswith('#')])
-                    result['variables'] = yaml.safe_load(cleaned_variables) or {}
+                    result['variables'] = yaml.load(cleaned_variables, Loader=YAML_LOADER) or {}
             except Exception as e:
                 logger.warning(f"Error parsing response as YAML: {str(e)}")
                 result['variables'] = {}
         
-        # If no specific sections found, try to extract based on code blocks
-        if not result['tasks'] and not result['handlers']:
-            # Look for specific task and handler sections
-            tasks_match = self._extract_code_block(response, "tasks.yml")
-            handlers_match = self._extract_code_block(response, "handlers.yml")
-            
-            if tasks_match:
-                result['tasks'] = self._parse_yaml_content(tasks_match)
-            
-            if handlers_match:
-                result['handlers'] = self._parse_yaml_content(handlers_match)
-        
-        # If still no specific sections found, try to extract any YAML block
-        if not result['tasks'] and not result['handlers']:
-            yaml_blocks = self._extract_all_yaml_blocks(response)
-            if yaml_blocks:
-                # Assume first block is tasks, second is handlers if present
-                result['tasks'] = self._parse_yaml_content(yaml_blocks[0])
-                if len(yaml_blocks) > 1:
-                    result['handlers'] = self._parse_yaml_content(yaml_blocks[1])
+        # If no specific sections found, fall back to the YAML blocks in order
+        if not result['tasks'] and not result['handlers'] and yaml_blocks:
+            # Assume first block is tasks, second is handlers if present
+            result['tasks'] = self._parse_yaml_content(yaml_blocks[0])
+            if has_handlers and len(yaml_blocks) > 1:
+                result['handlers'] = self._parse_yaml_content(yaml_blocks[1])
         
         # Log extraction results if verbose
         if self.config.verbose and hasattr(self.config, 'verbose'):
@@ -665,6 +1606,22 @@ YOU MUST FIX ALL ISSUES MENTIONED IN THE FEEDBACK ABOVE! Particularly:
                 }
             }]
     
+    def _scan_response(self, text):
+        """
+        Split an LLM response into its fenced code blocks in a single pass
+        
+        Args:
+            text (str): Response text
+            
+        Returns:
+            list: (label, language, body) tuples in response order, where label is
+                'Tasks', 'Handlers' or 'Variables' when the block follows that header
+        """
+        return [
+            (label, language, body.strip())
+            for label, language, body in RESPONSE_BLOCK_PATTERN.findall(text)
+        ]
+    
     def _extract_code_block(self, text, block_name):
         """
         Extract a specific code block from text
@@ -676,11 +1633,8 @@ YOU MUST FIX ALL ISSUES MENTIONED IN THE FEEDBACK ABOVE! Particularly:
         Returns:
             str: Extracted code block or None if not found
         """
-        import re
-        
         # Look for block with specific name
-        pattern = rf"(?:```yaml|```yml)\s*(?:#\s*{block_name})?\s*(.*?)```"
-        match = re.search(pattern, text, re.DOTALL)
+        match = re.search(_code_block_pattern(block_name), text)
         
         if match:
             return match.group(1).strip()
@@ -697,13 +1651,23 @@ YOU MUST FIX ALL ISSUES MENTIONED IN THE FEEDBACK ABOVE! Particularly:
         Returns:
             list: List of extracted YAML blocks
         """
-        import re
-        
-        # Extract all YAML blocks
-        pattern = r"```(?:yaml|yml)\s*(.*?)```"
-        matches = re.findall(pattern, text, re.DOTALL)
-        
-        return [match.strip() for match in matches]
+        # Walk the fences with str.find, which is much faster than a DOTALL regex on long responses
+        blocks = []
+        position = 0
+        while True:
+            openings = [(text.find(opener, position), opener) for opener in YAML_FENCE_OPENERS]
+            openings = [(index, opener) for index, opener in openings if index != -1]
+            if not openings:
+                break
+            index, opener = min(openings)
+            start = index + len(opener)
+            end = text.find(CODE_FENCE, start)
+            if end == -1:
+                break
+            blocks.append(text[start:end].strip())
+            position = end + len(CODE_FENCE)
+        
+        return blocks
         
     def _extract_section(self, text, section_name):
         """
@@ -716,18 +1680,16 @@ YOU MUST FIX ALL ISSUES MENTIONED IN THE FEEDBACK ABOVE! Particularly:
         Returns:
             str: Extracted section content or None if not found
         """
-        import re
+        block_pattern, list_pattern = _section_patterns(section_name)
         
         # Look for section headers like '# Tasks' or '# Handlers'
-        pattern = rf"#\s*{section_name}[^\n]*\n\s*```(?:yaml|yml)?\s*(.*?)```"
-        match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
+        match = block_pattern.search(text)
         
         if match:
             return match.group(1).strip()
             
         # Try alternative format without code blocks
-        pattern = rf"#\s*{section_name}[^\n]*\n((?:[ \t]*-.*\n)+)"
-        match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
+        match = list_pattern.search(text)
         
         if match:
             return match.group(1).strip()
@@ -738,23 +1700,29 @@ YOU MUST FIX ALL ISSUES MENTIONED IN THE FEEDBACK ABOVE! Particularly:
         """
         Parse YAML content to Python objects
         
+        Responses sometimes split tasks into several '---' separated documents,
+        so every document is loaded and their items are collected in order.
+        
         Args:
             yaml_content (str): YAML content to parse
             
         Returns:
             list: Parsed YAML content
         """
+        if not yaml_content or not yaml_content.strip():
+            return []
+        
         try:
-            # Try to parse the YAML content
-            parsed = yaml.safe_load(yaml_content)
-            
-            # Ensure we return a list
-            if parsed is None:
-                return []
-            elif isinstance(parsed, list):
-                return parsed
-            else:
-                return [parsed]
+            # Try to parse the YAML content, ensuring we return a list
+            parsed = []
+            for document in yaml.load_all(yaml_content, Loader=YAML_LOADER):
+                if document is None:
+                    continue
+                elif isinstance(document, list):
+                    parsed.extend(document)
+                else:
+                    parsed.append(document)
+            return parsed
         except yaml.YAMLError as e:
             logger.warning(f"YAML parsing failed: {e}")
             return []
@@ -777,33 +1745,53 @@ YOU MUST FIX ALL ISSUES MENTIONED IN THE FEEDBACK ABOVE! Particularly:
         # In a real implementation, this would parse Chef attributes and convert them to Ansible variables
         variables = {}
         
-        for attr_file in attributes:
-            # Build a prompt for the LLM to convert attributes
-            prompt = f"""
-Convert the following Chef attributes to Ansible variables:
-
-```ruby
-{attr_file['content']}
-```
-
-Please provide the equivalent Ansible variables in YAML format.
-"""
-            
-            # Call the Anthropic API
-            response = self._call_anthropic_api(prompt)
-            
+        # Build a prompt for the LLM to convert each attribute file
+        prompts = [self._build_attributes_prompt(attr_file) for attr_file in attributes]
+        
+        # Identical attribute files only need to be converted once
+        unique_prompts = list(dict.fromkeys(prompts))
+        
+        # Call the Anthropic API
+        responses = self._call_anthropic_api_many(unique_prompts)
+        
+        parsed_by_prompt = {}
+        for prompt, response in zip(unique_prompts, responses):
             # Extract YAML content
             yaml_block = self._extract_all_yaml_blocks(response)
             if yaml_block:
                 # Parse YAML content
                 parsed = self._parse_yaml_content(yaml_block[0])
                 if isinstance(parsed, list) and len(parsed) == 1 and isinstance(parsed[0], dict):
-                    variables.update(parsed[0])
+                    parsed_by_prompt[prompt] = parsed[0]
                 elif isinstance(parsed, dict):
-                    variables.update(parsed)
+                    parsed_by_prompt[prompt] = parsed
+        
+        # Apply in file order so later attribute files still take precedence
+        for prompt in prompts:
+            variables.update(parsed_by_prompt.get(prompt, {}))
         
         return variables
     
+    def _build_attributes_prompt(self, attr_file):
+        """
+        Build a prompt for the LLM to convert a Chef attribute file
+        
+        Args:
+            attr_file (dict): Parsed attribute file
+            
+        Returns:
+            str: Prompt for the LLM
+        """
+        return f"""
+Convert the following Chef attributes to Ansible variables:
+
+```ruby
+{attr_file['content']}
+```
+
+Please provide the equivalent Ansible variables in YAML format.
+"""
+    
     def convert_templates(self, templates):
         """
         Convert Chef templates to Ansible templates
@@ -818,7 +1806,7 @@ Please provide the equivalent Ansible variables in YAML format.
         
         if not templates:
             # If no templates were provided, create a sample template to demonstrate structure
-            print("No Chef templates found. Creating a sample template.")
+            logger.info("No Chef templates found. Creating a sample template.")
             sample_template = {
                 'name': 'sample',
                 'path': 'sample.j2',
@@ -866,10 +1854,10 @@ Please provide the equivalent Ansible variables in YAML format.
                     'content': converted_content
                 })
                 
-                print(f"Converted template: {template_name} -> {new_path}")
+                logger.debug(f"Converted template: {template_name} -> {new_path}")
                 
             except Exception as e:
-                print(f"Error converting template {template.get('name', 'unknown')}: {str(e)}")
+                logger.error(f"Error converting template {template.get('name', 'unknown')}: {str(e)}")
                 # Still include the template, but with an error message
                 ansible_templates.append({
                     'name': template.get('name', 'error_template'),
@@ -877,6 +1865,7 @@ Please provide the equivalent Ansible variables in YAML format.
                     'content': f"# Error converting template\n# {str(e)}\n\n{template.get('content', '')}"  
                 })
         
+        logger.info(f"Converted {len(ansible_templates)} templates")
         return ansible_templates
     
     def _convert_erb_to_jinja(self, erb_content):
@@ -892,74 +1881,53 @@ Please provide the equivalent Ansible variables in YAML format.
         if not erb_content:
             return ""
             
-        import re
-        
-        # Store the conversion in a log for debugging
-        conversion_log = ["ERB to Jinja2 conversion:"]
-        conversion_log.append(f"Original ERB:\n{erb_content[:200]}...")
+        # Only build the conversion log when it will actually be emitted
+        log_conversion = logger.isEnabledFor(logging.DEBUG)
+        if log_conversion:
+            conversion_log = ["ERB to Jinja2 conversion:"]
+            conversion_log.append(f"Original ERB:\n{erb_content[:200]}...")
         
-        # Step 1: Handle ERB output tags (<%= ... %>) - convert to Jinja2 {{ ... }}
-        # But first, escape any existing {{ or }} in the content
-        jinja_content = erb_content.replace('{{', r'\{\{').replace('}}', r'\}\}')
-        jinja_content = re.sub(r'<%=\s*(.+?)\s*%>', r'{{ \1 }}', jinja_content)
+        # Step 1: Escape any existing {{ or }} in the content
+        jinja_content = re.sub(JINJA_DELIMITER_PATTERN, lambda m: JINJA_DELIMITER_ESCAPES[m.group(0)], erb_content)
         
-        # Step 2: Handle ERB control flow tags (<% if ... %>, <% else %>, <% end %>, etc.)
-        # Convert if statements
-        jinja_content = re.sub(r'<%\s*if\s+(.+?)\s*%>', r'{% if \1 %}', jinja_content)
-        jinja_content = re.sub(r'<%\s*elsif\s+(.+?)\s*%>', r'{% elif \1 %}', jinja_content)
-        jinja_content = re.sub(r'<%\s*else\s*%>', r'{% else %}', jinja_content)
-        
-        # Convert loops
-        jinja_content = re.sub(r'<%\s*(.+?)\.each\s+do\s*\|\s*(.+?)\s*\|\s*%>', r'{% for \2 in \1 %}', jinja_content)
-        
-        # Convert end tags
-        jinja_content = re.sub(r'<%\s*end\s*%>', r'{% endfor %}', jinja_content)
-        # Check if we have more end tags than for tags, if so, convert some to endif
-        endfor_count = jinja_content.count('{% endfor %}')
-        for_count = len(re.findall(r'{%\s*for\s+', jinja_content))
-        if endfor_count > for_count:
-            # Replace the extra endfor tags with endif
-            jinja_content = jinja_content.replace('{% endfor %}', '{% endif %}', endfor_count - for_count)
-        
-        # Step 3: Convert remaining ERB tags (<% ... %>) to Jinja2 {% ... %}
-        jinja_content = re.sub(r'<%\s*(.+?)\s*%>', r'{% \1 %}', jinja_content)
+        # Steps 2-3: Convert every ERB tag in a single pass
+        # <%= ... %> -> {{ ... }}, <% if/elsif/else %> -> {% if/elif/else %},
+        # <% x.each do |y| %> -> {% for y in x %}, <% end %> -> {% endfor %} or {% endif %},
+        # and any other <% ... %> -> {% ... %}
+        jinja_content = re.sub(ERB_TAG_PATTERN, _make_erb_tag_replacer(), jinja_content)
         
         # Step 4: Convert Chef node attributes to Ansible variables
         # node['attribute'] -> attribute
-        # node['section']['attribute'] -> section_attribute
+        # node['section']['attribute'] -> section_attribute (any depth)
         # node[:attribute] -> attribute (Chef symbol syntax)
         # node.attribute -> attribute (Chef dot syntax)
         
-        # Handle node['attr'] syntax
-        jinja_content = re.sub(r"node\['([^']+)'\]\['([^']+)'\]\['([^']+)'\]", r"\1_\2_\3", jinja_content)
-        jinja_content = re.sub(r"node\['([^']+)'\]\['([^']+)'\]", r"\1_\2", jinja_content)
-        jinja_content = re.sub(r"node\['([^']+)'\]", r"\1", jinja_content)
-        
-        # Handle node[:attr] syntax
-        jinja_content = re.sub(r"node\[:([^\]]+)\]\[:([^\]]+)\]\[:([^\]]+)\]", r"\1_\2_\3", jinja_content)
-        jinja_content = re.sub(r"node\[:([^\]]+)\]\[:([^\]]+)\]", r"\1_\2", jinja_content)
-        jinja_content = re.sub(r"node\[:([^\]]+)\]", r"\1", jinja_content)
+        # Handle node['attr'] and node[:attr] syntax
+        for chain_pattern, key_pattern in NODE_ATTR_CHAINS:
+            jinja_content = re.sub(
+                chain_pattern,
+                lambda match, key_pattern=key_pattern: '_'.join(key_pattern.findall(match.group(1))),
+                jinja_content
+            )
         
         # Handle node.attr syntax
-        jinja_content = re.sub(r"node\.([a-zA-Z0-9_]+)", r"\1", jinja_content)
+        jinja_content = re.sub(NODE_DOT_ATTR_PATTERN, r"\1", jinja_content)
         
         # Special case for common node attributes
-        jinja_content = jinja_content.replace("hostname", "ansible_hostname")
-        jinja_content = jinja_content.replace("ipaddress", "ansible_default_ipv4.address")
-        jinja_content = jinja_content.replace("platform", "ansible_distribution")
-        jinja_content = jinja_content.replace("platform_version", "ansible_distribution_version")
+        jinja_content = re.sub(NODE_FACTS_PATTERN, lambda m: NODE_FACTS[m.group(0)], jinja_content)
         
         # Step 5: Convert Chef-specific functions to Ansible equivalents
         # Chef's File.exist? -> Jinja2's is defined
-        jinja_content = re.sub(r"File\.exist\?\(['\"](.*?)['\"]\)", r"'\1' is defined", jinja_content)
+        jinja_content = re.sub(FILE_EXIST_PATTERN, r"'\1' is defined", jinja_content)
         
         # Step 6: Convert Ruby string interpolation to Jinja2
         # "#{variable}" -> "{{ variable }}"
-        jinja_content = re.sub(r'"([^"]*?)#\{(.+?)\}([^"]*?)"', r'"\1{{ \2 }}\3"', jinja_content)
+        jinja_content = re.sub(RUBY_INTERPOLATION_PATTERN, r'"\1{{ \2 }}\3"', jinja_content)
         
         # Log the conversion result
-        conversion_log.append(f"Converted Jinja2:\n{jinja_content[:200]}...")
-        print("\n".join(conversion_log))
+        if log_conversion:
+            conversion_log.append(f"Converted Jinja2:\n{jinja_content[:200]}...")
+            logger.debug("\n".join(conversion_log))
         
         # Replace reserved variable names
         jinja_content = jinja_content.replace("{{ name }}", "{{ hostname }}")
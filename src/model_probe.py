@@ -0,0 +1,69 @@
+"""
+Model name probing shared by the model check scripts
+"""
+
+import asyncio
+
+import anthropic
+
+# Maximum number of probe requests in flight at once
+MAX_CONCURRENT_PROBES = 20
+
+
+async def probe_model(client, semaphore, model_name):
+    """
+    Probe a single model name
+
+    Args:
+        client (anthropic.AsyncAnthropic): Async Anthropic client
+        semaphore (asyncio.Semaphore): Limits the number of probes in flight
+        model_name (str): Model name to probe
+
+    Returns:
+        str: The model name if it is available, otherwise None
+    """
+    async with semaphore:
+        try:
+            # Just create a simple message to see if the model exists
+            await client.messages.create(
+                model=model_name,
+                max_tokens=10,
+                messages=[
+                    {"role": "user", "content": "Hello"}
+                ]
+            )
+            print(f"  Testing {model_name}... ✓ AVAILABLE")
+            return model_name
+        except anthropic.NotFoundError:
+            print(f"  Testing {model_name}... ✗ Not found")
+            return None
+        except anthropic.APIError as e:
+            print(f"  Testing {model_name}... ✗ Error: {str(e)}")
+            return None
+
+
+async def find_first_available(client, semaphore, model_names):
+    """
+    Probe all model names concurrently and return the first one that is available
+
+    Outstanding probes are cancelled as soon as a working model is found.
+
+    Args:
+        client (anthropic.AsyncAnthropic): Async Anthropic client
+        semaphore (asyncio.Semaphore): Limits the number of probes in flight
+        model_names (list): Model names to probe
+
+    Returns:
+        str: The first available model name, or None
+    """
+    tasks = [asyncio.ensure_future(probe_model(client, semaphore, name)) for name in model_names]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            model_name = await next_done
+            if model_name:
+                return model_name
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
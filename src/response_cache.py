@@ -0,0 +1,93 @@
+"""
+On-disk response cache for the Chef to Ansible converter
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import tempfile
+from pathlib import Path
+
+from src.logger import logger
+
+
+class ResponseCache:
+    """Content-addressed cache of conversion results stored as gzip-compressed JSON"""
+
+    def __init__(self, cache_dir, ttl_days=30):
+        """
+        Initialize the response cache
+
+        Args:
+            cache_dir (str or Path): Directory to store cache entries in
+            ttl_days (int): Number of days an entry stays valid
+        """
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.ttl_seconds = ttl_days * 24 * 60 * 60
+
+    @staticmethod
+    def make_key(*parts):
+        """
+        Build a cache key from JSON-serializable parts
+
+        Args:
+            *parts: Values that identify the cached result
+
+        Returns:
+            str: SHA-256 hex digest of the canonical JSON of the parts
+        """
+        canonical = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        """Get the file path for a cache key"""
+        return self.cache_dir / f"{key}.json.gz"
+
+    def get(self, key):
+        """
+        Look up a cached value
+
+        Args:
+            key (str): Cache key from make_key
+
+        Returns:
+            The cached value, or None if it is missing or expired
+        """
+        entry_path = self._entry_path(key)
+        try:
+            if time.time() - entry_path.stat().st_mtime > self.ttl_seconds:
+                return None
+            with gzip.open(entry_path, 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {entry_path}: {str(e)}")
+            return None
+
+    def set(self, key, value):
+        """
+        Store a value in the cache
+
+        Args:
+            key (str): Cache key from make_key
+            value: JSON-serializable value to store
+        """
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry {key}: {str(e)}")
+            return
+
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+                json.dump(value, f, default=str)
+            os.replace(tmp_path, self._entry_path(key))
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to write cache entry {key}: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
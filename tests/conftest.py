@@ -0,0 +1,10 @@
+"""
+Shared pytest fixtures
+"""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_response_cache(tmp_path, monkeypatch):
+    """Keep the LLM response cache out of the user's home directory during tests"""
+    monkeypatch.setenv('CHEF_TO_ANSIBLE_CACHE_DIR', str(tmp_path / 'response_cache'))
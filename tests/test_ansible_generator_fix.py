@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the AnsibleGenerator variable fix helpers
+"""
+import os
+import sys
+import pytest
+import yaml
+
+# Add the repository root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ansible_generator_fix import extract_task_variables, ensure_variables_defined
+
+
+class TestAnsibleGeneratorFix:
+    """Test cases for the variable extraction and defaults helpers"""
+
+    def test_extract_task_variables(self):
+        """Test that variables are found in nested dicts, lists and keys"""
+        tasks = [
+            {
+                "name": "Configure {{ service_name }}",
+                "ansible.builtin.template": {
+                    "src": "app.conf.j2",
+                    "dest": "{{ config_dir }}/app.conf",
+                    "mode": "0644"
+                },
+                "loop": ["{{ first_item }}", {"nested": ["{{ nested_item }}"]}],
+                "when": "ansible_facts['os_family'] == 'Debian'"
+            },
+            {
+                "ansible.builtin.set_fact": {"{{ fact_key }}": True},
+                "vars": {"facts": "{{ ansible_facts }}", "check": "{{ ansible_check_mode }}"},
+                "retries": 3
+            }
+        ]
+        
+        assert extract_task_variables(tasks) == {
+            "service_name", "config_dir", "first_item", "nested_item", "fact_key"
+        }
+
+    def test_ensure_variables_defined(self, tmp_path):
+        """Test that missing variables are added to existing defaults"""
+        defaults_file = tmp_path / "defaults" / "main.yml"
+        defaults_file.parent.mkdir()
+        defaults_file.write_text("nginx_port: 80\n")
+        ansible_data = {
+            "tasks": [{"ansible.builtin.file": {"path": "{{ nginx_dir }}", "mode": "{{ nginx_port }}"}}],
+            "handlers": [{"ansible.builtin.service": {"name": "{{ app_service }}"}}]
+        }
+        
+        ensure_variables_defined(ansible_data, defaults_file)
+        
+        assert yaml.safe_load(defaults_file.read_text()) == {
+            "nginx_port": 80,
+            "nginx_dir": "/etc/nginx",
+            "app_service": "CHANGEME_app_service"
+        }
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared API client module
+"""
+import os
+import sys
+import pytest
+
+# Add src directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api_client import get_client, get_http_client
+
+
+class TestAPIClient:
+    """Test cases for the shared API client helpers"""
+
+    def test_http_client_is_shared(self):
+        """Test that the HTTP connection pool is created once per process"""
+        assert get_http_client() is get_http_client()
+
+    def test_clients_share_connection_pool(self):
+        """Test that clients for different keys reuse the same connection pool"""
+        first = get_client("first_key")
+        second = get_client("second_key")
+
+        assert first.api_key == "first_key"
+        assert second.api_key == "second_key"
+        assert first._client is get_http_client()
+        assert second._client is get_http_client()
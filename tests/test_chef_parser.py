@@ -18,7 +18,7 @@ from src.chef_parser import ChefParser
 class TestChefParser:
     """Test cases for the ChefParser class"""
 
-    def test_parse_recipes(self):
+    def test_parse_recipes(self, tmp_path):
         """Test parsing recipes"""
         parser = ChefParser()
         
@@ -32,43 +32,56 @@ class TestChefParser:
         end
         """
         
-        # Mock Path.exists and Path.glob
-        with patch("pathlib.Path.exists", return_value=True):
-            with patch("pathlib.Path.glob") as mock_glob:
-                mock_glob.return_value = [Path("recipes/default.rb")]
-                
-                # Mock open to return our test recipe
-                with patch("builtins.open", mock_open(read_data=chef_recipe)):
-                    result = parser._parse_recipes(Path("recipes"))
-                    
-                    assert result is not None
-                    assert len(result) == 1
-                    assert "content" in result[0]
-                    assert "package" in result[0]["content"]
-                    assert "service" in result[0]["content"]
+        recipes_dir = tmp_path / "recipes"
+        recipes_dir.mkdir()
+        (recipes_dir / "default.rb").write_text(chef_recipe)
+        (recipes_dir / "README.md").write_text("Not a recipe")
+        
+        result = parser._parse_recipes(recipes_dir)
+        
+        assert result is not None
+        assert len(result) == 1
+        assert "content" in result[0]
+        assert "package" in result[0]["content"]
+        assert "service" in result[0]["content"]
 
-    def test_find_cookbooks(self):
+    def test_find_cookbooks(self, tmp_path):
         """Test finding cookbooks in a repository"""
         parser = ChefParser()
         
-        # Mock Path.glob to return a list of metadata files
-        with patch("pathlib.Path.glob") as mock_glob:
-            mock_glob.return_value = [
-                Path("/repo/cookbook1/metadata.rb"),
-                Path("/repo/cookbook2/metadata.rb")
-            ]
+        # Create two cookbooks plus a metadata.rb inside a pruned directory
+        for name in ["cookbook1", "cookbook2"]:
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "metadata.rb").write_text(f"name '{name}'\n")
+        (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+        (tmp_path / "node_modules" / "pkg" / "metadata.rb").write_text("name 'ignored'\n")
+        
+        # Mock _extract_cookbook_name to return cookbook names
+        with patch.object(parser, "_extract_cookbook_name") as mock_extract:
+            mock_extract.side_effect = ["cookbook1", "cookbook2"]
             
-            # Mock _extract_cookbook_name to return cookbook names
-            with patch.object(parser, "_extract_cookbook_name") as mock_extract:
-                mock_extract.side_effect = ["cookbook1", "cookbook2"]
-                
-                cookbooks = parser.find_cookbooks("/repo")
-                
-                assert len(cookbooks) == 2
-                assert cookbooks[0]["name"] == "cookbook1"
-                assert cookbooks[1]["name"] == "cookbook2"
+            cookbooks = parser.find_cookbooks(str(tmp_path))
+            
+            assert len(cookbooks) == 2
+            assert cookbooks[0]["name"] == "cookbook1"
+            assert cookbooks[1]["name"] == "cookbook2"
+            assert cookbooks[0]["path"] == tmp_path / "cookbook1"
+
+    def test_find_cookbooks_sees_changes_below_root(self, tmp_path):
+        """Test that cookbooks added or renamed below the repository root are found on the next scan"""
+        (tmp_path / "cookbooks" / "a").mkdir(parents=True)
+        (tmp_path / "cookbooks" / "a" / "metadata.rb").write_text("name 'a'\n")
+        parser = ChefParser()
+        
+        assert [c["name"] for c in parser.find_cookbooks(str(tmp_path))] == ["a"]
+        
+        (tmp_path / "cookbooks" / "b").mkdir()
+        (tmp_path / "cookbooks" / "b" / "metadata.rb").write_text("name 'b'\n")
+        (tmp_path / "cookbooks" / "a" / "metadata.rb").write_text("name 'renamed'\n")
+        
+        assert sorted(c["name"] for c in parser.find_cookbooks(str(tmp_path))) == ["b", "renamed"]
 
-    def test_find_templates(self):
+    def test_find_templates(self, tmp_path):
         """Test finding templates"""
         parser = ChefParser()
         
@@ -88,26 +101,20 @@ class TestChefParser:
         }
         """
         
-        # Mock Path.exists and Path.glob
-        with patch("pathlib.Path.exists", return_value=True):
-            with patch("pathlib.Path.glob") as mock_glob:
-                # The actual implementation uses glob('**/*') and then checks is_file()
-                mock_file = MagicMock()
-                mock_file.is_file.return_value = True
-                mock_file.name = "nginx.conf.erb"
-                mock_file.relative_to.return_value = Path("default/nginx.conf.erb")
-                mock_glob.return_value = [mock_file]
-                
-                # Mock open to return our test template
-                with patch("builtins.open", mock_open(read_data=erb_template)):
-                    result = parser._find_templates(Path("templates"))
-                    
-                    assert result is not None
-                    assert len(result) == 1
-                    assert "content" in result[0]
-                    assert "name" in result[0]
-                    assert "path" in result[0]
-                    assert result[0]["name"] == "nginx.conf.erb"
+        templates_dir = tmp_path / "templates"
+        (templates_dir / "default").mkdir(parents=True)
+        (templates_dir / "default" / "nginx.conf.erb").write_text(erb_template)
+        
+        result = parser._find_templates(templates_dir)
+        
+        assert result is not None
+        assert len(result) == 1
+        assert "content" in result[0]
+        assert "name" in result[0]
+        assert "path" in result[0]
+        assert result[0]["name"] == "nginx.conf.erb"
+        assert result[0]["path"] == os.path.join("default", "nginx.conf.erb")
+        assert result[0]["content"] == erb_template
 
     def test_parse_cookbook(self):
         """Test parsing cookbook"""
@@ -133,6 +140,24 @@ class TestChefParser:
                                         assert len(result["recipes"]) == 1
                                         assert len(result["templates"]) == 1
     
+    def test_parse_cookbook_skips_missing_sections(self, tmp_path):
+        """Test that sections missing from the cookbook are not parsed"""
+        parser = ChefParser()
+        
+        cookbook_path = tmp_path / "cookbooks" / "nginx"
+        (cookbook_path / "recipes").mkdir(parents=True)
+        (cookbook_path / "metadata.rb").write_text("name 'nginx'\n")
+        (cookbook_path / "recipes" / "default.rb").write_text("package 'nginx' do\n  action :install\nend\n")
+        
+        with patch.object(parser, "_parse_libraries") as mock_libraries:
+            result = parser.parse_cookbook(cookbook_path)
+            
+            mock_libraries.assert_not_called()
+            assert result["metadata"]["name"] == "nginx"
+            assert len(result["recipes"]) == 1
+            assert result["libraries"] == []
+            assert result["templates"] == []
+    
     def test_extract_resources(self):
         """Test extracting resources from recipe content"""
         parser = ChefParser()
@@ -169,7 +194,7 @@ class TestChefParser:
         assert result[2]['type'] == 'service'
         assert result[2]['name'] == 'nginx'
     
-    def test_parse_attributes(self):
+    def test_parse_attributes(self, tmp_path):
         """Test parsing attribute files"""
         parser = ChefParser()
         
@@ -179,50 +204,38 @@ class TestChefParser:
         default['nginx']['port'] = 80
         """
         
-        # Mock Path.exists and Path.glob
-        with patch("pathlib.Path.exists", return_value=True):
-            with patch("pathlib.Path.glob") as mock_glob:
-                mock_glob.return_value = [Path("attributes/default.rb")]
-                
-                # Mock open to return our test attributes
-                with patch("builtins.open", mock_open(read_data=attr_content)):
-                    result = parser._parse_attributes(Path("attributes"))
-                    
-                    assert result is not None
-                    assert len(result) == 1
-                    assert "name" in result[0]
-                    assert "content" in result[0]
-                    assert result[0]["name"] == "default"
-                    assert "nginx" in result[0]["content"]
+        attributes_dir = tmp_path / "attributes"
+        attributes_dir.mkdir()
+        (attributes_dir / "default.rb").write_text(attr_content)
+        
+        result = parser._parse_attributes(attributes_dir)
+        
+        assert result is not None
+        assert len(result) == 1
+        assert "name" in result[0]
+        assert "content" in result[0]
+        assert result[0]["name"] == "default"
+        assert "nginx" in result[0]["content"]
     
-    def test_find_files(self):
+    def test_find_files(self, tmp_path):
         """Test finding static files"""
         parser = ChefParser()
         
-        # Mock Path.exists and Path.glob
-        with patch("pathlib.Path.exists", return_value=True):
-            with patch("pathlib.Path.glob") as mock_glob:
-                # Mock file paths
-                mock_file1 = MagicMock()
-                mock_file1.is_file.return_value = True
-                mock_file1.name = "nginx.conf"
-                mock_file1.relative_to.return_value = Path("default/nginx.conf")
-                
-                mock_file2 = MagicMock()
-                mock_file2.is_file.return_value = True
-                mock_file2.name = "vhost.conf"
-                mock_file2.relative_to.return_value = Path("default/vhost.conf")
-                
-                mock_glob.return_value = [mock_file1, mock_file2]
-                
-                result = parser._find_files(Path("files"))
-                
-                assert result is not None
-                assert len(result) == 2
-                assert result[0]["name"] == "nginx.conf"
-                assert result[1]["name"] == "vhost.conf"
+        files_dir = tmp_path / "files"
+        (files_dir / "default").mkdir(parents=True)
+        (files_dir / "default" / "nginx.conf").write_text("worker_processes 1;")
+        (files_dir / "default" / "vhost.conf").write_text("server {}")
+        
+        result = parser._find_files(files_dir)
+        
+        assert result is not None
+        assert len(result) == 2
+        result = sorted(result, key=lambda f: f["name"])
+        assert result[0]["name"] == "nginx.conf"
+        assert result[1]["name"] == "vhost.conf"
+        assert result[0]["path"] == os.path.join("default", "nginx.conf")
     
-    def test_parse_resources(self):
+    def test_parse_resources(self, tmp_path):
         """Test parsing custom resource files"""
         parser = ChefParser()
         
@@ -238,24 +251,21 @@ class TestChefParser:
         end
         """
         
-        # Mock Path.exists and Path.glob
-        with patch("pathlib.Path.exists", return_value=True):
-            with patch("pathlib.Path.glob") as mock_glob:
-                mock_glob.return_value = [Path("resources/custom.rb")]
-                
-                # Mock open to return our test resource
-                with patch("builtins.open", mock_open(read_data=resource_content)):
-                    result = parser._parse_resources(Path("resources"))
-                    
-                    assert result is not None
-                    assert len(result) == 1
-                    assert "name" in result[0]
-                    assert "content" in result[0]
-                    assert result[0]["name"] == "custom"
-                    assert "property" in result[0]["content"]
-                    assert "action" in result[0]["content"]
+        resources_dir = tmp_path / "resources"
+        resources_dir.mkdir()
+        (resources_dir / "custom.rb").write_text(resource_content)
+        
+        result = parser._parse_resources(resources_dir)
+        
+        assert result is not None
+        assert len(result) == 1
+        assert "name" in result[0]
+        assert "content" in result[0]
+        assert result[0]["name"] == "custom"
+        assert "property" in result[0]["content"]
+        assert "action" in result[0]["content"]
     
-    def test_parse_libraries(self):
+    def test_parse_libraries(self, tmp_path):
         """Test parsing library files"""
         parser = ChefParser()
         
@@ -270,21 +280,18 @@ class TestChefParser:
         Chef::Recipe.include MyHelpers
         """
         
-        # Mock Path.exists and Path.glob
-        with patch("pathlib.Path.exists", return_value=True):
-            with patch("pathlib.Path.glob") as mock_glob:
-                mock_glob.return_value = [Path("libraries/helpers.rb")]
-                
-                # Mock open to return our test library
-                with patch("builtins.open", mock_open(read_data=library_content)):
-                    result = parser._parse_libraries(Path("libraries"))
-                    
-                    assert result is not None
-                    assert len(result) == 1
-                    assert "name" in result[0]
-                    assert "content" in result[0]
-                    assert result[0]["name"] == "helpers"
-                    assert "module" in result[0]["content"]
+        libraries_dir = tmp_path / "libraries"
+        libraries_dir.mkdir()
+        (libraries_dir / "helpers.rb").write_text(library_content)
+        
+        result = parser._parse_libraries(libraries_dir)
+        
+        assert result is not None
+        assert len(result) == 1
+        assert "name" in result[0]
+        assert "content" in result[0]
+        assert result[0]["name"] == "helpers"
+        assert "module" in result[0]["content"]
     
     def test_find_data_bags(self):
         """Test finding data bags"""
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the metrics collection script
+"""
+import os
+import sys
+import pytest
+from pathlib import Path
+
+# Add the repository root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from collect_metrics import MetricsCollector, PARALLEL_ROLE_THRESHOLD
+
+
+class TestMetricsCollector:
+    """Test cases for the MetricsCollector class"""
+
+    def _write_role(self, role_dir, tasks, defaults=None):
+        """Write a minimal role with the given tasks and defaults YAML"""
+        (role_dir / "tasks").mkdir(parents=True)
+        (role_dir / "tasks" / "main.yml").write_text(tasks)
+        if defaults is not None:
+            (role_dir / "defaults").mkdir()
+            (role_dir / "defaults" / "main.yml").write_text(defaults)
+
+    def test_analyze_ansible_role(self, tmp_path):
+        """Test the compliance metrics of a role"""
+        role_dir = tmp_path / "nginx"
+        self._write_role(role_dir, """
+- name: Install nginx
+  ansible.builtin.package:
+    name: "{{ nginx_package }}"
+    state: present
+- name: start nginx
+  service:
+    name: nginx
+    enabled: true
+""", defaults="nginx_package: nginx\n")
+        
+        metrics = MetricsCollector.analyze_ansible_role(role_dir)
+        
+        assert metrics["task_count"] == 2
+        assert metrics["fqcn_compliance"] == 50.0
+        assert metrics["capitalization_compliance"] == 50.0
+        assert metrics["boolean_compliance"] == 50.0
+        assert metrics["variable_definition_compliance"] == 100.0
+
+    def test_analyze_ansible_role_yes_is_not_boolean_compliant(self, tmp_path):
+        """Test that yes/no values do not count as true/false usage"""
+        role_dir = tmp_path / "nginx"
+        self._write_role(role_dir, """
+- name: Enable nginx
+  ansible.builtin.service:
+    name: nginx
+    enabled: yes
+""")
+        
+        metrics = MetricsCollector.analyze_ansible_role(role_dir)
+        
+        assert metrics["task_count"] == 1
+        assert metrics["boolean_compliance"] == 0
+
+    def test_collect_run_metrics_in_parallel(self, tmp_path, capsys):
+        """Test that large runs analyze every role and print each worker error whole"""
+        roles_dir = tmp_path / "roles"
+        for i in range(PARALLEL_ROLE_THRESHOLD):
+            self._write_role(roles_dir / f"role{i:02d}", "- name: Install\n  ansible.builtin.package:\n    name: nginx\n")
+        (roles_dir / "role03" / "tasks" / "main.yml").write_text("- name: [broken\n")
+        (roles_dir / "role07" / "tasks" / "main.yml").write_text("- name: [broken\n")
+        collector = MetricsCollector(tmp_path / "metrics")
+        
+        run_metrics = collector.collect_run_metrics("nginx", roles_dir, 1.0)
+        
+        assert run_metrics["role_count"] == PARALLEL_ROLE_THRESHOLD
+        assert [role["task_count"] for role in run_metrics["roles"]].count(1) == PARALLEL_ROLE_THRESHOLD - 2
+        messages = capsys.readouterr().out.split("Error analyzing tasks")[1:]
+        assert len(messages) == 2
+        assert sorted("role03" in message for message in messages) == [False, True]
+        assert sorted("role07" in message for message in messages) == [False, True]
@@ -166,6 +166,136 @@ server {
                 assert "{% else %}" in results[0]["content"]
                 assert "{% endif %}" in results[0]["content"]
 
+    def test_convert_recipe_without_notifications_skips_handlers(self):
+        """Test that recipes without notifications neither ask for nor return handlers"""
+        response = """
+# Tasks
+```yaml
+- name: Install nginx
+  ansible.builtin.package:
+    name: nginx
+    state: present
+```
+
+# Handlers
+```yaml
+- name: Restart nginx
+  ansible.builtin.service:
+    name: nginx
+    state: restarted
+```
+"""
+        recipe = {"name": "test", "path": "test.rb", "content": "package 'nginx'"}
+        
+        with patch.object(self.converter, '_call_anthropic_api', return_value=response) as mock_call:
+            result = self.converter.convert_recipe(recipe)
+            assert "# Handlers" not in mock_call.call_args.args[0]
+            assert result["tasks"][0]["name"] == "Install nginx"
+            assert result["handlers"] == []
+            
+            recipe["content"] += "\n  notifies :restart, 'service[nginx]'"
+            result = self.converter.convert_recipe(recipe)
+            assert "# Handlers" in mock_call.call_args.args[0]
+            assert result["handlers"][0]["name"] == "Restart nginx"
+    
+    def test_convert_recipe_reuses_conversion_of_reformatted_recipe(self):
+        """Test that recipes differing only in comments and whitespace share a cached conversion"""
+        response = "# Tasks\n```yaml\n- name: Install nginx\n  ansible.builtin.package:\n    name: nginx\n```\n"
+        original = {"name": "a", "path": "a.rb", "content": "package 'nginx' do\n  action :install\nend\n"}
+        reformatted = {"name": "b", "path": "b.rb", "content": "# Install the web server\n\npackage 'nginx' do   \n  action :install\nend\n"}
+        script = {"name": "c", "path": "c.rb", "content": "bash 'setup' do\n  code <<-EOH\n  # keep me\n  EOH\nend\n"}
+        script_without_comment = {"name": "d", "path": "d.rb", "content": "bash 'setup' do\n  code <<-EOH\n  EOH\nend\n"}
+        config = {"name": "e", "path": "e.rb", "content": "file '/etc/x.conf' do\n  content '\nlisten 80\n# listen 443\n'\nend\n"}
+        config_without_comment = {"name": "f", "path": "f.rb", "content": "file '/etc/x.conf' do\n  content '\nlisten 80\n'\nend\n"}
+        percent = {"name": "g", "path": "g.rb", "content": "file '/etc/y.conf' do\n  content %q{\n# {nested} comment\n}\nend\n"}
+        percent_without_comment = {"name": "h", "path": "h.rb", "content": "file '/etc/y.conf' do\n  content %q{\n}\nend\n"}
+        
+        with patch.object(self.converter, '_call_anthropic_api', return_value=response) as mock_call:
+            first = self.converter.convert_recipe(original)
+            second = self.converter.convert_recipe(reformatted)
+            assert first == second
+            assert mock_call.call_count == 1
+            
+            # Comments inside heredocs are content, not Ruby comments
+            self.converter.convert_recipe(script)
+            self.converter.convert_recipe(script_without_comment)
+            assert mock_call.call_count == 3
+            
+            # So are comment-like lines inside multi-line quoted and percent literals
+            self.converter.convert_recipe(config)
+            self.converter.convert_recipe(config_without_comment)
+            self.converter.convert_recipe(percent)
+            self.converter.convert_recipe(percent_without_comment)
+            assert mock_call.call_count == 7
+    
+    def test_convert_recipe_splits_oversized_recipe(self):
+        """Test that recipes too large for one request are converted at resource boundaries"""
+        recipe = {"name": "big", "path": "big.rb", "content": "package 'nginx' do\n  action :install\nend\n"
+                  "service 'nginx' do\n  action :start\nend\n"}
+        overhead = self.converter._estimate_tokens(self.converter._build_conversion_prompt(dict(recipe, content="")))
+        self.converter.config.max_input_tokens = self.config.max_tokens + overhead + 20
+        responses = [
+            "# Tasks\n```yaml\n- name: Install nginx\n  ansible.builtin.package:\n    name: nginx\n```\n",
+            "# Tasks\n```yaml\n- name: Start nginx\n  ansible.builtin.service:\n    name: nginx\n```\n"
+        ]
+        
+        with patch.object(self.converter, '_call_anthropic_api', side_effect=responses) as mock_call:
+            result = self.converter.convert_recipe(recipe)
+            assert mock_call.call_count == 2
+            assert "service 'nginx'" not in mock_call.call_args_list[0].args[0]
+            assert [task["name"] for task in result["tasks"]] == ["Install nginx", "Start nginx"]
+        
+        # A single resource that cannot fit fails before any API call
+        recipe["content"] = "execute 'long' do\n  command '" + "x" * 200 + "'\nend\n"
+        with patch.object(self.converter, '_call_anthropic_api') as mock_call:
+            with pytest.raises(RuntimeError):
+                self.converter.convert_recipe(recipe)
+            mock_call.assert_not_called()
+    
+    def test_convert_recipe_rule_based(self):
+        """Test that recipes of simple resources are converted without the API when enabled"""
+        self.converter.config.use_rule_based = True
+        recipe = {"name": "web", "path": "web.rb", "content": "# Web server\npackage 'nginx'\n\n"
+                  "service 'nginx' do\n  action [:enable, :start]\nend\ndirectory '/var/www'\n"}
+        
+        with patch.object(self.converter, '_call_anthropic_api') as mock_call:
+            result = self.converter.convert_recipe(recipe)
+            mock_call.assert_not_called()
+        
+        assert result["tasks"] == [
+            {"name": "Install package nginx", "ansible.builtin.package": {"name": "nginx", "state": "present"}},
+            {"name": "Enable and start service nginx",
+             "ansible.builtin.service": {"name": "nginx", "enabled": True, "state": "started"}},
+            {"name": "Create directory /var/www", "ansible.builtin.file": {"path": "/var/www", "state": "directory"}}
+        ]
+        assert result["handlers"] == []
+        
+        # Feedback on an earlier conversion is acted on by the LLM
+        response = "# Tasks\n```yaml\n- name: Install nginx\n  ansible.builtin.package:\n    name: nginx\n```\n"
+        with patch.object(self.converter, '_call_anthropic_api', return_value=response) as mock_call:
+            result = self.converter.convert_recipe(recipe, feedback="Pin the nginx version")
+            assert mock_call.call_count == 1
+            assert "Pin the nginx version" in mock_call.call_args.args[0]
+        assert result["tasks"][0]["name"] == "Install nginx"
+        
+        # Anything beyond a name and an action still goes to the LLM
+        for content in ("package 'nginx' do\n  version '1.2'\nend\n", "service 'nginx'\n", "package node['pkg']\n"):
+            assert self.converter._try_rule_based_convert({"content": content}) is None
+    
+    def test_split_oversized_recipe_counts_feedback(self):
+        """Test that the context window check includes feedback without rebuilding the prompt"""
+        recipe = {"name": "big", "path": "big.rb", "content": "package 'nginx' do\n  action :install\nend\n"
+                  "service 'nginx' do\n  action :start\nend\n"}
+        feedback = "The nginx service task is missing a handler"
+        overhead = self.converter._estimate_tokens(self.converter._build_conversion_prompt(dict(recipe, content="")))
+        feedback_tokens = self.converter._estimate_tokens(self.converter._get_feedback_text(feedback))
+        self.converter.config.max_input_tokens = self.config.max_tokens + overhead + feedback_tokens + 20
+        
+        with patch.object(self.converter, '_build_conversion_prompt') as mock_build:
+            assert self.converter._split_oversized_recipe(recipe) == [recipe]
+            assert len(self.converter._split_oversized_recipe(recipe, feedback)) == 2
+            mock_build.assert_not_called()
+    
     def test_api_error_handling(self):
         """Test handling of API errors"""
         # Mock _call_anthropic_api to raise an exception
@@ -180,6 +310,122 @@ server {
             with pytest.raises(Exception):
                 self.converter.convert_recipe(recipe)
     
+    def test_call_anthropic_api_streams_with_progress_callback(self):
+        """Test that responses are streamed when progress updates are wanted"""
+        updates = []
+        converter = LLMConverter(self.config, progress_callback=updates.append)
+        chunks = ["chunk "] * 40
+        
+        with patch.object(converter, 'client') as mock_client:
+            stream = mock_client.messages.stream.return_value.__enter__.return_value
+            stream.text_stream = iter(chunks)
+            response = converter._call_anthropic_api("Convert this recipe")
+        
+        assert response == "".join(chunks)
+        mock_client.messages.create.assert_not_called()
+        receiving = [update for update in updates if "Receiving response" in update['message']]
+        assert len(receiving) == 40 // 16
+        assert all(50 <= update['progress'] < 75 for update in receiving)
+    
+    def test_call_anthropic_api_reuses_cached_response(self):
+        """Test that an identical prompt is answered from the response cache"""
+        with patch.object(self.converter, 'client') as mock_client:
+            mock_client.messages.create.return_value.content = [MagicMock(text="cached answer")]
+            
+            first = self.converter._call_anthropic_api("Convert this recipe")
+            second = self.converter._call_anthropic_api("Convert this recipe")
+            
+            assert first == second == "cached answer"
+            assert mock_client.messages.create.call_count == 1
+            
+            # Changing the sampling settings misses the cache
+            self.converter.config.temperature = 0
+            self.converter._call_anthropic_api("Convert this recipe")
+            assert mock_client.messages.create.call_count == 2
+    
+    def test_call_anthropic_api_retries_rate_limits(self):
+        """Test that rate limited calls are retried after the Retry-After delay"""
+        import anthropic
+        import httpx
+        
+        request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+        rate_limited = anthropic.RateLimitError(
+            "rate limited",
+            response=httpx.Response(429, request=request, headers={"retry-after": "3"}),
+            body=None
+        )
+        message = MagicMock()
+        message.content = [MagicMock(text="converted")]
+        updates = []
+        converter = LLMConverter(self.config)
+        converter.cache = None
+        
+        with patch.object(converter, 'client') as mock_client, patch('src.llm_converter.time.sleep') as mock_sleep:
+            mock_client.messages.create.side_effect = [rate_limited, message]
+            with patch.object(converter, '_stream_anthropic_api', side_effect=[rate_limited, "streamed"]):
+                assert converter._call_anthropic_api("Convert this recipe") == "converted"
+                
+                converter.progress_callback = updates.append
+                assert converter._call_anthropic_api("Convert this recipe") == "streamed"
+        
+        assert mock_client.messages.create.call_count == 2
+        mock_sleep.assert_called_with(3.0)
+        assert any("retrying" in update['message'] for update in updates)
+    
+    def test_call_anthropic_api_retries_server_errors(self):
+        """Test that failing, unavailable and overloaded servers are retried"""
+        import anthropic
+        import httpx
+        
+        request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+        sdk_client = anthropic.Anthropic(api_key="test_key")
+        failures = [
+            sdk_client._make_status_error("server error", body=None, response=httpx.Response(status, request=request))
+            for status in (500, 503, 529)
+        ]
+        message = MagicMock()
+        message.content = [MagicMock(text="converted")]
+        converter = LLMConverter(self.config)
+        converter.cache = None
+        
+        with patch.object(converter, 'client') as mock_client, patch('src.llm_converter.time.sleep'):
+            mock_client.messages.create.side_effect = failures + [message]
+            assert converter._call_anthropic_api("Convert this recipe") == "converted"
+        
+        assert mock_client.messages.create.call_count == 4
+    
+    def test_call_anthropic_api_caps_concurrent_calls(self):
+        """Test that nested thread pools never exceed max_concurrency live API calls"""
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        
+        self.config.max_concurrency = 2
+        converter = LLMConverter(self.config)
+        converter.cache = None
+        lock = threading.Lock()
+        active = []
+        peak = []
+        
+        def create(**kwargs):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.pop()
+            message = MagicMock()
+            message.content = [MagicMock(text="converted")]
+            return message
+        
+        with patch.object(converter, 'client') as mock_client:
+            mock_client.messages.create.side_effect = create
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                list(executor.map(converter._call_anthropic_api_concurrently, [[f"a{i}" for i in range(4)], [f"b{i}" for i in range(4)]]))
+        
+        assert mock_client.messages.create.call_count == 8
+        assert max(peak) <= 2
+    
     def test_load_examples(self):
         """Test loading conversion examples"""
         # The _load_examples method returns a hardcoded list of examples
@@ -215,6 +461,25 @@ server {
                 assert "IMPORTANT: Follow these Ansible best practices" in prompt
                 assert "ANSIBLE CODE:" in prompt
     
+    def test_message_content_marks_prefix_for_caching(self):
+        """Test that the shared prompt prefix is sent as a cacheable block"""
+        recipe = {
+            "name": "test",
+            "path": "test.rb",
+            "content": "package 'apache2'"
+        }
+        prompt = self.converter._build_conversion_prompt(recipe)
+        
+        content = self.converter._message_content(prompt)
+        
+        assert content[0]["cache_control"] == {"type": "ephemeral"}
+        assert "package 'apache2'" not in content[0]["text"]
+        assert "package 'apache2'" in content[1]["text"]
+        assert content[0]["text"] + content[1]["text"] == prompt
+        
+        # Prompts without the shared prefix are sent unchanged
+        assert self.converter._message_content("Convert these attributes") == "Convert these attributes"
+    
     def test_extract_ansible_code(self):
         """Test extracting Ansible code from LLM response"""
         response = """
@@ -256,6 +521,25 @@ This Ansible code will install the apache2 package and create a handler to resta
                 assert result["tasks"][0]["name"] == "Install apache2"
                 assert result["handlers"][0]["name"] == "Restart apache2"
     
+    def test_parse_yaml_content_multiple_documents(self):
+        """Test that tasks split across YAML documents are all kept"""
+        yaml_content = """---
+- name: Install nginx
+  ansible.builtin.package:
+    name: nginx
+---
+- name: Start nginx
+  ansible.builtin.service:
+    name: nginx
+    state: started
+"""
+        
+        result = self.converter._parse_yaml_content(yaml_content)
+        
+        assert [task["name"] for task in result] == ["Install nginx", "Start nginx"]
+        assert self.converter._parse_yaml_content("key: value") == [{"key": "value"}]
+        assert self.converter._parse_yaml_content("# only a comment") == []
+    
     def test_extract_code_block(self):
         """Test extracting code block from text"""
         text = """
@@ -294,6 +578,12 @@ This Ansible code will install the apache2 package and create a handler to resta
             assert "- name: Restart apache2" in result
             assert "ansible.builtin.service" in result
     
+    def test_extract_all_yaml_blocks(self):
+        """Test extracting every fenced YAML block in response order"""
+        text = "# Tasks\n```yaml\n- name: a\n```\n```ruby\nputs 1\n```\n```yml\n- name: b\n```\n```yaml\nunclosed"
+        
+        assert self.converter._extract_all_yaml_blocks(text) == ["- name: a", "- name: b"]
+    
     def test_convert_cookbook(self):
         """Test converting a cookbook"""
         cookbook = {
@@ -353,6 +643,148 @@ This Ansible code will install the apache2 package and create a handler to resta
                             assert len(result["tasks"]) == 1
                             assert result["tasks"][0]["name"] == "Install apache2"
     
+    def test_convert_cookbook_keeps_recipe_order(self):
+        """Test that concurrently converted recipes are merged in recipe order"""
+        import time
+        
+        cookbook = {
+            "name": "test_cookbook",
+            "recipes": [
+                {"name": "first", "path": "recipes/first.rb", "content": "# first"},
+                {"name": "second", "path": "recipes/second.rb", "content": "# second"},
+                {"name": "third", "path": "recipes/third.rb", "content": "# third"}
+            ]
+        }
+        
+        def fake_convert_recipe(recipe, feedback=None):
+            # Finish the first recipe last
+            if recipe["name"] == "first":
+                time.sleep(0.05)
+            return {
+                "tasks": [{"name": recipe["name"]}],
+                "handlers": [],
+                "variables": {"shared": recipe["name"]}
+            }
+        
+        self.converter.config.max_concurrency = 3
+        with patch.object(self.converter, 'convert_recipe', side_effect=fake_convert_recipe):
+            with patch.object(self.converter, 'progress_callback', None):
+                result = self.converter.convert_cookbook(cookbook)
+        
+        assert [task["name"] for task in result["tasks"]] == ["first", "second", "third"]
+        assert result["variables"]["shared"] == "third"
+    
+    def test_convert_cookbook_converts_duplicate_recipes_once(self):
+        """Test that recipes with identical content share one conversion"""
+        cookbook = {
+            "name": "test_cookbook",
+            "recipes": [
+                {"name": "default", "path": "recipes/default.rb", "content": "package 'nginx'"},
+                {"name": "other", "path": "recipes/other.rb", "content": "service 'nginx'"},
+                {"name": "copy", "path": "recipes/copy.rb", "content": "package 'nginx'"}
+            ]
+        }
+        
+        def fake_convert_recipe(recipe, feedback=None):
+            return {"tasks": [{"name": recipe["content"]}], "handlers": []}
+        
+        with patch.object(self.converter, 'convert_recipe', side_effect=fake_convert_recipe) as mock_convert_recipe:
+            with patch.object(self.converter, 'progress_callback', None):
+                result = self.converter.convert_cookbook(cookbook)
+        
+        assert mock_convert_recipe.call_count == 2
+        assert [task["name"] for task in result["tasks"]] == ["package 'nginx'", "service 'nginx'", "package 'nginx'"]
+        assert result["tasks"][0] is not result["tasks"][2]
+    
+    def test_submit_batch(self):
+        """Test that batch results are mapped back to their prompts"""
+        def batch_entry(custom_id, text):
+            entry = MagicMock()
+            entry.custom_id = custom_id
+            entry.result.type = "succeeded"
+            entry.result.message.content = [MagicMock(text=text)]
+            return entry
+        
+        batches = MagicMock()
+        batches.create.return_value = MagicMock(id="batch_1", processing_status="in_progress")
+        batches.retrieve.return_value = MagicMock(id="batch_1", processing_status="ended")
+        # Results are not guaranteed to come back in submission order
+        batches.results.return_value = [batch_entry("r1", "second"), batch_entry("r0", "first")]
+        
+        self.converter.config.batch_poll_interval = 0
+        with patch.object(self.converter, 'client') as mock_client:
+            mock_client.messages.batches = batches
+            responses = self.converter._submit_batch(["prompt one", "prompt two"])
+        
+        assert responses == ["first", "second"]
+        requests = batches.create.call_args.kwargs["requests"]
+        assert [request["custom_id"] for request in requests] == ["r0", "r1"]
+        assert requests[1]["params"]["messages"][0]["content"] == "prompt two"
+    
+    def test_submit_batch_converts_failed_requests_live(self):
+        """Test that failed batch requests are retried live while successes are kept and cached"""
+        succeeded = MagicMock(custom_id="r0")
+        succeeded.result.type = "succeeded"
+        succeeded.result.message.content = [MagicMock(text="first")]
+        errored = MagicMock(custom_id="r1")
+        errored.result.type = "errored"
+        
+        batches = MagicMock()
+        batches.create.return_value = MagicMock(id="batch_1", processing_status="ended")
+        batches.results.return_value = [errored, succeeded]
+        
+        with patch.object(self.converter, 'client') as mock_client, \
+             patch.object(self.converter, '_call_anthropic_api', return_value="live second") as mock_call:
+            mock_client.messages.batches = batches
+            responses = self.converter._submit_batch(["prompt one", "prompt two"])
+        
+        assert responses == ["first", "live second"]
+        mock_call.assert_called_once_with("prompt two")
+        assert self.converter.cache.get(self.converter._response_cache_key("prompt one")) == "first"
+    
+    def test_submit_batch_cancels_unfinished_batch(self):
+        """Test that a batch still running after the maximum wait is cancelled and converted live"""
+        batches = MagicMock()
+        batches.create.return_value = MagicMock(id="batch_1", processing_status="in_progress")
+        
+        self.converter.config.batch_max_wait = 0
+        with patch.object(self.converter, 'client') as mock_client, \
+             patch.object(self.converter, '_call_anthropic_api', side_effect=["one", "two"]):
+            mock_client.messages.batches = batches
+            responses = self.converter._submit_batch(["prompt one", "prompt two"])
+        
+        assert responses == ["one", "two"]
+        batches.cancel.assert_called_once_with("batch_1")
+        batches.results.assert_not_called()
+    
+    def test_convert_cookbook_batch_plans_each_recipe_once(self):
+        """Test that batch mode converts rule based and oversized recipes without recomputing them"""
+        self.converter.config.use_batch_api = True
+        self.converter.config.use_rule_based = True
+        simple = {"name": "simple", "path": "simple.rb", "content": "package 'nginx'\n"}
+        script = {"name": "script", "path": "script.rb", "content": "bash 'b' do\nend\n"}
+        big = {"name": "big", "path": "big.rb", "content": "execute 'one' do\n  command 'echo one'\nend\n"
+               "execute 'two' do\n  command 'echo two'\nend\n"}
+        overhead = self.converter._estimate_tokens(self.converter._build_conversion_prompt(dict(big, content="")))
+        self.converter.config.max_input_tokens = self.config.max_tokens + overhead + 20
+        cookbook = {"name": "web", "recipes": [simple, script, big]}
+        
+        def response(name):
+            return f"# Tasks\n```yaml\n- name: {name}\n  ansible.builtin.command: echo\n```\n"
+        
+        with patch.object(self.converter, '_submit_batch', return_value=[response("Script")]) as mock_batch, \
+             patch.object(self.converter, '_call_anthropic_api',
+                          side_effect=lambda prompt, **kwargs: response("One" if "echo one" in prompt else "Two")), \
+             patch.object(self.converter, '_split_oversized_recipe', wraps=self.converter._split_oversized_recipe) as split, \
+             patch.object(self.converter, '_try_rule_based_convert', wraps=self.converter._try_rule_based_convert) as rule:
+            result = self.converter.convert_cookbook(cookbook)
+        
+        assert len(mock_batch.call_args.args[0]) == 1
+        assert [task["name"] for task in result["tasks"]] == ["Install package nginx", "Script", "One", "Two"]
+        for recipe in (simple, script, big):
+            assert [c.args[0]["content"] for c in split.call_args_list].count(recipe["content"]) == 1
+        assert [c.args[0]["content"] for c in rule.call_args_list].count(simple["content"]) == 1
+    
     def test_convert_attributes(self):
         """Test converting Chef attributes to Ansible variables"""
         attributes = [{
@@ -411,6 +843,38 @@ PHP Disabled
             assert "{% else %}" in result
             assert "{% endif %}" in result
     
+    def test_convert_erb_to_jinja_closes_nested_blocks(self):
+        """Test that each ERB end tag closes the block it belongs to"""
+        erb_content = """<% @servers.each do |server| %>
+<% if server.enabled %>
+server <%= server.name %>;
+<% end %>
+<% end %>
+<% if @ssl %>
+ssl on;
+<% end %>
+"""
+        
+        result = self.converter._convert_erb_to_jinja(erb_content)
+        
+        assert result == """{% for server in @servers %}
+{% if server.enabled %}
+server {{ server.name }};
+{% endif %}
+{% endfor %}
+{% if @ssl %}
+ssl on;
+{% endif %}
+"""
+    
+    def test_convert_erb_to_jinja_node_attribute_chains(self):
+        """Test that node attribute lookups of any depth become underscored variables"""
+        erb_content = "<%= node['nginx']['ssl']['protocols']['default'] %> <%= node[:app][:db][:host] %> <%= node['port'] %>"
+        
+        result = self.converter._convert_erb_to_jinja(erb_content)
+        
+        assert result == "{{ nginx_ssl_protocols_default }} {{ app_db_host }} {{ port }}"
+    
     def test_convert_files(self):
         """Test converting Chef files to Ansible files"""
         files = [{
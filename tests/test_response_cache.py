@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the ResponseCache module
+"""
+import os
+import sys
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+
+# Add src directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import Config
+from src.llm_converter import LLMConverter
+from src.response_cache import ResponseCache
+
+
+class TestResponseCache:
+    """Test cases for the ResponseCache class"""
+
+    def test_round_trip(self, tmp_path):
+        """Test storing and loading a cached value"""
+        cache = ResponseCache(tmp_path)
+        key = ResponseCache.make_key("model", {"name": "nginx"})
+
+        assert cache.get(key) is None
+        cache.set(key, {"tasks": [{"name": "Install nginx"}]})
+        assert cache.get(key) == {"tasks": [{"name": "Install nginx"}]}
+
+    def test_make_key_is_order_independent(self):
+        """Test that dictionary key order does not change the cache key"""
+        assert ResponseCache.make_key({"a": 1, "b": 2}) == ResponseCache.make_key({"b": 2, "a": 1})
+        assert ResponseCache.make_key({"a": 1}) != ResponseCache.make_key({"a": 2})
+
+    def test_expired_entry(self, tmp_path):
+        """Test that entries older than the TTL are ignored"""
+        cache = ResponseCache(tmp_path, ttl_days=1)
+        key = ResponseCache.make_key("old")
+        cache.set(key, {"value": 1})
+
+        two_days_ago = time.time() - 2 * 24 * 60 * 60
+        os.utime(tmp_path / f"{key}.json.gz", (two_days_ago, two_days_ago))
+
+        assert cache.get(key) is None
+
+    def test_convert_cookbook_uses_cache(self):
+        """Test that converting an identical cookbook again makes no API calls"""
+        converter = LLMConverter(Config(api_key="test_key"))
+        cookbook = {
+            "name": "nginx",
+            "recipes": [{"name": "default", "path": "recipes/default.rb", "content": "package 'nginx'"}]
+        }
+
+        response = "# Tasks\n```yaml\n- name: Install nginx\n  ansible.builtin.package:\n    name: nginx\n```\n"
+        with patch.object(converter, '_call_anthropic_api', return_value=response) as mock_call:
+            first = converter.convert_cookbook(cookbook)
+            second = converter.convert_cookbook(cookbook)
+
+            assert mock_call.call_count == 1
+            assert first == second
+            assert first["tasks"][0]["name"] == "Install nginx"
+
+    def test_convert_recipe_stores_one_entry(self):
+        """Test that a live recipe conversion is cached once, under the recipe key only"""
+        converter = LLMConverter(Config(api_key="test_key"))
+        recipe = {"name": "default", "path": "recipes/default.rb", "content": "package 'nginx'"}
+        message = MagicMock()
+        message.content = [MagicMock(text="# Tasks\n```yaml\n- name: Install nginx\n```\n")]
+
+        with patch.object(converter, 'client') as mock_client:
+            mock_client.messages.create.return_value = message
+            converter.convert_recipe(recipe)
+
+        assert len(list(converter.cache.cache_dir.glob("*.json.gz"))) == 1
+
+    def test_convert_cookbook_without_cache(self):
+        """Test that disabling the cache always converts the cookbook"""
+        config = Config(api_key="test_key")
+        config.use_cache = False
+        converter = LLMConverter(config)
+        cookbook = {"name": "nginx", "recipes": [{"name": "default", "content": "package 'nginx'"}]}
+
+        with patch.object(converter, 'convert_recipe') as mock_convert_recipe:
+            mock_convert_recipe.return_value = {"tasks": [], "handlers": []}
+
+            converter.convert_cookbook(cookbook)
+            converter.convert_cookbook(cookbook)
+
+            assert mock_convert_recipe.call_count == 2
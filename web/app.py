@@ -620,23 +620,20 @@ def download_conversion(conversion_id):
     # Create a new zip file with all the converted roles
     try:
         # Use zipfile module for more control over the zip creation process
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
             # Walk through the conversion directory and add all files
             for root, dirs, files in os.walk(conversion_dir):
                 for file in files:
                     file_path = os.path.join(root, file)
                     # Calculate the relative path for the zip file
                     rel_path = os.path.relpath(file_path, conversion_dir)
-                    print(f"Adding to zip: {rel_path}")
                     zipf.write(file_path, rel_path)
+            zipped_files = zipf.namelist()
+            total_bytes = sum(info.file_size for info in zipf.infolist())
         
-        print(f"Created zip file at {zip_path}")
-        
-        # Debug: Print the contents of the zip file
-        with zipfile.ZipFile(zip_path, 'r') as zipf:
-            print(f"Zip file contains {len(zipf.namelist())} files:")
-            for file_name in zipf.namelist():
-                print(f"  - {file_name}")
+        logger.info(f"Zipped {len(zipped_files)} files ({total_bytes} bytes) to {zip_path}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("\n".join(f"  - {file_name}" for file_name in zipped_files))
     except Exception as e:
         app.logger.error(f"Error creating zip file: {str(e)}")
         flash('Error creating zip file.', 'error')